@@ -0,0 +1,34 @@
+"""store batch document embeddings as float16 binary
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "004"
+down_revision = "003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Embeddings are derived data and are regenerated when a batch is
+    # reprocessed, so the JSON column is replaced rather than converted.
+    op.drop_column("batch_documents", "embedding")
+    op.add_column(
+        "batch_documents",
+        sa.Column("embedding", sa.LargeBinary(), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("batch_documents", "embedding")
+    op.add_column(
+        "batch_documents",
+        sa.Column("embedding", sa.JSON(), nullable=True)
+    )
@@ -0,0 +1,112 @@
+"""store batch similarity matrices as compressed float16 binary
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import math
+import numpy as np
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+
+# revision identifiers, used by Alembic.
+revision = "005"
+down_revision = "004"
+branch_labels = None
+depends_on = None
+
+# The storage format is frozen here rather than imported from app.models, so
+# this revision keeps producing the same bytes if the model codec changes.
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def _encode_matrix(matrix) -> bytes:
+    """Pack a square matrix into zstd-compressed (or raw) float16 bytes"""
+    payload = np.asarray(matrix, dtype=np.float16).tobytes()
+    if ZSTD_AVAILABLE:
+        return zstandard.ZstdCompressor().compress(payload)
+    return payload
+
+
+def _decode_matrix(payload: bytes) -> list:
+    """Unpack bytes written by _encode_matrix() into nested float lists"""
+    if payload[:4] == _ZSTD_MAGIC:
+        payload = zstandard.ZstdDecompressor().decompress(payload)
+    values = np.frombuffer(payload, dtype=np.float16)
+    n = math.isqrt(values.size)
+    return values.reshape(n, n).astype(np.float32).tolist()
+
+
+def upgrade() -> None:
+    op.add_column(
+        "batch_analysis_jobs",
+        sa.Column("similarity_matrix_blob", sa.LargeBinary(), nullable=True)
+    )
+
+    # Convert existing matrices so completed jobs keep their results
+    jobs = sa.table(
+        "batch_analysis_jobs",
+        sa.column("id", sa.Integer),
+        sa.column("similarity_matrix", sa.JSON),
+        sa.column("similarity_matrix_blob", sa.LargeBinary),
+    )
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(jobs.c.id, jobs.c.similarity_matrix).where(
+            jobs.c.similarity_matrix.isnot(None)
+        )
+    ).fetchall()
+    for job_id, matrix in rows:
+        bind.execute(
+            jobs.update().where(jobs.c.id == job_id).values(
+                similarity_matrix_blob=_encode_matrix(matrix)
+            )
+        )
+
+    op.drop_column("batch_analysis_jobs", "similarity_matrix")
+    op.alter_column(
+        "batch_analysis_jobs",
+        "similarity_matrix_blob",
+        new_column_name="similarity_matrix"
+    )
+
+
+def downgrade() -> None:
+    op.add_column(
+        "batch_analysis_jobs",
+        sa.Column("similarity_matrix_json", sa.JSON(), nullable=True)
+    )
+
+    jobs = sa.table(
+        "batch_analysis_jobs",
+        sa.column("id", sa.Integer),
+        sa.column("similarity_matrix", sa.LargeBinary),
+        sa.column("similarity_matrix_json", sa.JSON),
+    )
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(jobs.c.id, jobs.c.similarity_matrix).where(
+            jobs.c.similarity_matrix.isnot(None)
+        )
+    ).fetchall()
+    for job_id, payload in rows:
+        bind.execute(
+            jobs.update().where(jobs.c.id == job_id).values(
+                similarity_matrix_json=_decode_matrix(payload)
+            )
+        )
+
+    op.drop_column("batch_analysis_jobs", "similarity_matrix")
+    op.alter_column(
+        "batch_analysis_jobs",
+        "similarity_matrix_json",
+        new_column_name="similarity_matrix"
+    )
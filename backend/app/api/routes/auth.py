@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from datetime import timedelta
@@ -22,6 +22,7 @@ from app.utils.auth import (
     verify_refresh_token,
     revoke_refresh_token,
     revoke_all_user_refresh_tokens,
+    clear_password_verification_cache,
     get_current_user,
     ACCESS_TOKEN_EXPIRE_MINUTES,
 )
@@ -39,7 +40,12 @@ router = APIRouter(prefix="/api/auth", tags=["auth"])
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 @auth_rate_limit
-async def register(user_data: UserCreate, request: Request, db: Session = Depends(get_db)):
+async def register(
+    user_data: UserCreate,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
     """Register a new user"""
     # Check if user already exists
     existing_user = db.query(User).filter(User.email == user_data.email).first()
@@ -71,8 +77,8 @@ async def register(user_data: UserCreate, request: Request, db: Session = Depend
     # Log registration
     log_auth_event("register", user_id=new_user.id, user_email=new_user.email, success=True)
     
-    # Send verification email
-    await send_verification_email(db, new_user)
+    # Send verification email after the response is returned
+    await send_verification_email(db, new_user, background_tasks)
     
     return new_user
 
@@ -214,13 +220,17 @@ def refresh_token(request: RefreshTokenRequest, db: Session = Depends(get_db)):
 
 
 @router.post("/forgot-password")
-async def forgot_password(request: ForgotPasswordRequest, db: Session = Depends(get_db)):
+async def forgot_password(
+    request: ForgotPasswordRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
     """Request password reset email"""
     user = db.query(User).filter(User.email == request.email).first()
     
     # Always return success to prevent email enumeration
     if user:
-        await send_password_reset_email(db, user)
+        await send_password_reset_email(db, user, background_tasks)
     
     return {"message": "If the email exists, a password reset link has been sent."}
 
@@ -246,6 +256,7 @@ def reset_password(request: ResetPasswordRequest, db: Session = Depends(get_db))
     
     # Update password
     user.password_hash = get_password_hash(request.new_password)
+    clear_password_verification_cache()
     
     # Revoke all refresh tokens for security
     revoke_all_user_refresh_tokens(db, user.id)
@@ -274,6 +285,7 @@ def verify_email(request: EmailVerificationRequest, db: Session = Depends(get_db
 
 @router.post("/resend-verification")
 async def resend_verification_email(
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -286,7 +298,7 @@ async def resend_verification_email(
             detail="Email already verified"
         )
     
-    await send_verification_email(db, user)
+    await send_verification_email(db, user, background_tasks)
     
     return {"message": "Verification email sent"}
 
@@ -315,6 +327,7 @@ def change_password(
     
     # Update password
     current_user.password_hash = get_password_hash(request.new_password)
+    clear_password_verification_cache()
     
     # Revoke all refresh tokens for security
     revoke_all_user_refresh_tokens(db, current_user.id)
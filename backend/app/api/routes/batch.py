@@ -21,7 +21,7 @@ from app.models.schemas import (
     BatchDocumentStatus,
 )
 from app.services.analysis_service import get_analysis_service
-from app.services.batch_analysis_service import get_batch_analysis_service
+from app.services.batch_analysis_service import get_batch_analysis_service, decode_embedding
 from app.middleware.input_sanitization import sanitize_text
 from app.utils.file_validation import validate_file_size, validate_text_length
 from app.utils.auth import get_current_user
@@ -600,7 +600,10 @@ def get_document_detail(
         ai_probability=document.ai_probability,
         confidence_distribution=document.confidence_distribution,
         heat_map_data=document.heat_map_data,
-        embedding=document.embedding,
+        embedding=(
+            decode_embedding(document.embedding).tolist()
+            if document.embedding is not None else None
+        ),
         cluster_id=document.cluster_id,
         error_message=document.error_message,
         created_at=document.created_at
@@ -59,7 +59,8 @@ def upload_writing_sample(
     
     if file:
         # Validate file
-        validate_upload_file(file)
+        content_length = request.headers.get("content-length", "") if request else ""
+        validate_upload_file(file, int(content_length) if content_length.isdigit() else None)
         sanitized_filename = sanitize_filename(file.filename)
         
         # Read file content
@@ -13,7 +13,7 @@ celery_app = Celery(
     "ghostwriter",
     broker=REDIS_URL,
     backend=REDIS_URL,
-    include=["app.tasks"]
+    include=["app.tasks", "app.tasks.maintenance_tasks"]
 )
 
 # Celery configuration
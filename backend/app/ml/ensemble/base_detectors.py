@@ -7,6 +7,7 @@ Provides sklearn-compatible wrapper classes for:
 3. ContrastiveDetectorWrapper - Siamese network embedding-based detection
 """
 
+import math
 import numpy as np
 from typing import Dict, Optional, Union
 
@@ -377,15 +378,13 @@ class ContrastiveDetectorWrapper:
         Returns:
             Similarity score (0-1, higher = more similar)
         """
-        # Cosine similarity
-        dot_product = np.dot(features1, features2)
-        norm1 = np.linalg.norm(features1)
-        norm2 = np.linalg.norm(features2)
+        # Cosine similarity; squared norms via vdot, so only one sqrt is taken
+        squared_norms = np.vdot(features1, features1) * np.vdot(features2, features2)
 
-        if norm1 == 0 or norm2 == 0:
+        if squared_norms == 0:
             return 0.0
 
-        similarity = dot_product / (norm1 * norm2)
+        similarity = np.vdot(features1, features2) / math.sqrt(squared_norms)
 
         # Clamp to [0, 1]
         return float(max(0.0, min(1.0, similarity)))
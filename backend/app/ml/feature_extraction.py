@@ -1,32 +1,10 @@
 import numpy as np
-import nltk
 from typing import Dict, List, Tuple
 from collections import Counter
 import re
 import requests
 import math
-from app.utils.text_processing import split_into_sentences, split_into_paragraphs
-
-# Download NLTK data if needed
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt', quiet=True)
-
-try:
-    nltk.data.find('taggers/averaged_perceptron_tagger')
-except LookupError:
-    nltk.download('averaged_perceptron_tagger', quiet=True)
-
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords', quiet=True)
-
-try:
-    nltk.data.find('corpora/wordnet')
-except LookupError:
-    nltk.download('wordnet', quiet=True)
+from app.utils.text_processing import split_into_sentences, split_into_paragraphs, ensure_nltk_data
 
 
 def calculate_burstiness(text: str) -> float:
@@ -185,6 +163,11 @@ def extract_syntactic_features(text: str) -> Dict[str, float]:
     Returns distributions of parts of speech.
     """
     try:
+        # NLTK and its data are loaded on first use
+        import nltk
+        ensure_nltk_data('punkt')
+        ensure_nltk_data('averaged_perceptron_tagger')
+        
         tokens = nltk.word_tokenize(text.lower())
         pos_tags = nltk.pos_tag(tokens)
         
@@ -182,15 +182,13 @@ class FingerprintComparator:
             )
             return float(result[0, 0])
         else:
-            # Manual calculation
-            dot_product = np.dot(vec1, vec2)
-            norm1 = np.linalg.norm(vec1)
-            norm2 = np.linalg.norm(vec2)
+            # Manual calculation; squared norms via vdot, so only one sqrt is taken
+            squared_norms = np.vdot(vec1, vec1) * np.vdot(vec2, vec2)
 
-            if norm1 == 0 or norm2 == 0:
+            if squared_norms == 0:
                 return 0.0
 
-            similarity = dot_product / (norm1 * norm2)
+            similarity = np.vdot(vec1, vec2) / math.sqrt(squared_norms)
             # Clamp to [0, 1] for similarity (cosine can be negative)
             return float(max(0.0, min(1.0, similarity)))
 
@@ -3,12 +3,93 @@ Helpers for obtaining embeddings from a local Ollama server.
 """
 from __future__ import annotations
 
+import logging
 import os
-from typing import Optional
+from typing import List, Optional, Tuple
 
 import numpy as np
 import requests
 
+from app.utils.cache import get_cached, set_cached
+
+logger = logging.getLogger(__name__)
+
+
+# Default number of texts sent per /api/embed request
+EMBEDDING_BATCH_SIZE = 32
+
+# Dimension assumed until the model's real dimension is known
+DEFAULT_EMBEDDING_DIM = 768
+
+# How long a discovered dimension is remembered in Redis (1 week)
+CACHE_TTL_EMBEDDING_DIM = 7 * 24 * 3600
+
+# Embedding dimension of the configured model, discovered on first use
+_EMBEDDING_DIM: Optional[int] = None
+
+
+def _get_ollama_config() -> Tuple[str, str]:
+    """Return the Ollama base URL and embedding model name."""
+    ollama_base_url = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+    model = (
+        os.getenv("OLLAMA_EMBEDDING_MODEL")
+        or os.getenv("OLLAMA_MODEL")
+        or "llama3.1:8b"
+    )
+    return ollama_base_url, model
+
+
+def _embedding_dim_cache_key(model: str) -> str:
+    """Redis key holding the embedding dimension for a model."""
+    return f"ollama:embedding_dim:{model}"
+
+
+def get_embedding_dim() -> int:
+    """
+    Return the embedding dimension of the configured Ollama model.
+
+    Resolution order: value discovered in this process, the
+    OLLAMA_EMBEDDING_DIM env var, a value persisted to Redis by another
+    worker, then DEFAULT_EMBEDDING_DIM. No extra Ollama request is made.
+    """
+    global _EMBEDDING_DIM
+    if _EMBEDDING_DIM is not None:
+        return _EMBEDDING_DIM
+
+    env_dim = os.getenv("OLLAMA_EMBEDDING_DIM")
+    if env_dim:
+        _EMBEDDING_DIM = int(env_dim)
+        return _EMBEDDING_DIM
+
+    _, model = _get_ollama_config()
+    cached_dim = get_cached(_embedding_dim_cache_key(model))
+    if cached_dim:
+        _EMBEDDING_DIM = int(cached_dim)
+        return _EMBEDDING_DIM
+
+    return DEFAULT_EMBEDDING_DIM
+
+
+def _record_embedding_dim(dim: int) -> None:
+    """Remember a dimension observed in a real embedding response."""
+    global _EMBEDDING_DIM
+    if _EMBEDDING_DIM == dim:
+        return
+    _EMBEDDING_DIM = dim
+    _, model = _get_ollama_config()
+    set_cached(_embedding_dim_cache_key(model), dim, CACHE_TTL_EMBEDDING_DIM)
+
+
+def _normalize(embedding: List[float]) -> np.ndarray:
+    """Convert an embedding to a unit-length numpy vector."""
+    vec = np.array(embedding, dtype=float)
+    _record_embedding_dim(vec.shape[0])
+    # Normalize to unit vector to be compatible with simple similarity heuristics
+    norm = np.linalg.norm(vec)
+    if norm > 0:
+        vec = vec / norm
+    return vec
+
 
 def get_ollama_embedding(text: str) -> Optional[np.ndarray]:
     """
@@ -21,12 +102,7 @@ def get_ollama_embedding(text: str) -> Optional[np.ndarray]:
     if not text or not text.strip():
         return None
 
-    ollama_base_url = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
-    model = (
-        os.getenv("OLLAMA_EMBEDDING_MODEL")
-        or os.getenv("OLLAMA_MODEL")
-        or "llama3.1:8b"
-    )
+    ollama_base_url, model = _get_ollama_config()
 
     try:
         resp = requests.post(
@@ -44,27 +120,80 @@ def get_ollama_embedding(text: str) -> Optional[np.ndarray]:
             embedding = data["embeddings"][0]
 
         if embedding is None:
-            print("Warning: Ollama embeddings response missing 'embedding' field")
+            logger.warning("Ollama embeddings response missing 'embedding' field")
             return None
 
-        vec = np.array(embedding, dtype=float)
-        # Normalize to unit vector to be compatible with simple similarity heuristics
-        norm = np.linalg.norm(vec)
-        if norm > 0:
-            vec = vec / norm
-        return vec
+        return _normalize(embedding)
     except requests.exceptions.ConnectionError:
-        print(
-            f"Warning: Cannot connect to Ollama at {ollama_base_url}. "
+        logger.warning(
+            f"Cannot connect to Ollama at {ollama_base_url}. "
             "Falling back to stylometric features."
         )
     except requests.exceptions.Timeout:
-        print(
-            f"Warning: Ollama embeddings request to {ollama_base_url} timed out. "
+        logger.warning(
+            f"Ollama embeddings request to {ollama_base_url} timed out. "
             "Falling back to stylometric features."
         )
     except Exception as e:
-        print(f"Warning: Error getting Ollama embedding: {e}. Falling back to stylometric.")
+        logger.warning(f"Error getting Ollama embedding: {e}. Falling back to stylometric.")
 
     return None
 
+
+def get_ollama_embeddings(
+    texts: List[str],
+    batch_size: int = EMBEDDING_BATCH_SIZE
+) -> List[Optional[np.ndarray]]:
+    """
+    Get embedding vectors for many texts using batched Ollama requests.
+
+    Uses the /api/embed endpoint, which accepts a list of inputs, so each
+    request covers up to ``batch_size`` texts instead of one.
+
+    Args:
+        texts: Texts to embed
+        batch_size: Maximum number of texts per HTTP request
+
+    Returns:
+        List aligned with ``texts``; entries are None for empty texts or
+        for texts whose batch request failed.
+    """
+    results: List[Optional[np.ndarray]] = [None] * len(texts)
+
+    # Only send non-empty texts, remembering their original positions
+    indexed = [(i, t) for i, t in enumerate(texts) if t and t.strip()]
+    if not indexed:
+        return results
+
+    ollama_base_url, model = _get_ollama_config()
+
+    for start in range(0, len(indexed), batch_size):
+        batch = indexed[start:start + batch_size]
+        try:
+            resp = requests.post(
+                f"{ollama_base_url}/api/embed",
+                json={"model": model, "input": [t for _, t in batch]},
+                timeout=30 + 5 * len(batch),
+            )
+            resp.raise_for_status()
+            embeddings = resp.json().get("embeddings")
+
+            if not embeddings or len(embeddings) != len(batch):
+                logger.warning("Ollama embed response missing or misaligned 'embeddings' field")
+                continue
+
+            for (i, _), embedding in zip(batch, embeddings):
+                results[i] = _normalize(embedding)
+        except requests.exceptions.ConnectionError:
+            logger.warning(
+                f"Cannot connect to Ollama at {ollama_base_url}. "
+                "Falling back to stylometric features."
+            )
+            # Remaining batches would fail the same way
+            break
+        except requests.exceptions.Timeout:
+            logger.warning(f"Ollama embed request to {ollama_base_url} timed out.")
+        except Exception as e:
+            logger.warning(f"Error getting Ollama embeddings: {e}.")
+
+    return results
@@ -10,13 +10,144 @@ Provides functionality for:
 from typing import List, Dict
 import numpy as np
 
+try:
+    import simsimd
+    SIMSIMD_AVAILABLE = True
+except ImportError:
+    SIMSIMD_AVAILABLE = False
+
+try:
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import connected_components
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+# Batch size from which SimSIMD compares int8-quantized embeddings instead
+# of float32 (a quarter of the memory traffic; similarities are off by about
+# 0.3/127 on average and under 2/127 in the worst case)
+INT8_MIN_DOCUMENTS = 256
+
+# Scale mapping unit-vector components in [-1, 1] onto int8
+INT8_SCALE = 127.0
+
+# Batch size from which the NumPy path fills the similarity matrix in row
+# tiles, so each tile's products stay cache-resident
+TILED_MIN_DOCUMENTS = 4096
+SIMILARITY_TILE_ROWS = 256
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _union_find_kernel(adjacency):
+        """
+        Connected-component labels of a boolean adjacency matrix.
+
+        Each component's root is its lowest index, so labels are numbered
+        in order of first appearance.
+        """
+        n = adjacency.shape[0]
+        parent = np.arange(n)
+        for i in range(n):
+            for j in range(i + 1, n):
+                if not adjacency[i, j]:
+                    continue
+                root_i = i
+                while parent[root_i] != root_i:
+                    parent[root_i] = parent[parent[root_i]]
+                    root_i = parent[root_i]
+                root_j = j
+                while parent[root_j] != root_j:
+                    parent[root_j] = parent[parent[root_j]]
+                    root_j = parent[root_j]
+                if root_i < root_j:
+                    parent[root_j] = root_i
+                elif root_j < root_i:
+                    parent[root_i] = root_j
+
+        labels = np.empty(n, dtype=np.int64)
+        next_label = 0
+        for x in range(n):
+            root = x
+            while parent[root] != root:
+                root = parent[root]
+            if root == x:
+                labels[x] = next_label
+                next_label += 1
+            else:
+                # The root is a lower index, so it is already labelled
+                labels[x] = labels[root]
+        return labels
+
+    @njit(parallel=True, cache=True)
+    def _cluster_average_kernel(similarity, order, offsets):
+        """
+        Mean pairwise similarity per cluster, parallelized over clusters.
+
+        Cluster c is order[offsets[c]:offsets[c + 1]]; single-document
+        clusters get 1.0.
+        """
+        n_clusters = offsets.shape[0] - 1
+        out = np.empty(n_clusters, dtype=np.float64)
+        for c in prange(n_clusters):
+            start = offsets[c]
+            end = offsets[c + 1]
+            size = end - start
+            if size < 2:
+                out[c] = 1.0
+                continue
+            total = 0.0
+            for a in range(start, end):
+                row = order[a]
+                for b in range(a + 1, end):
+                    total += similarity[row, order[b]]
+            out[c] = total / (size * (size - 1) / 2)
+        return out
+
+
+# Storage dtype for persisted document embeddings
+EMBEDDING_STORAGE_DTYPE = np.float16
+
+
+def encode_embedding(embedding) -> bytes:
+    """
+    Pack an embedding vector into compact float16 bytes for storage.
+
+    Args:
+        embedding: Embedding vector (list of floats or numpy array)
+
+    Returns:
+        Raw float16 bytes (2 bytes per dimension)
+    """
+    return np.asarray(embedding, dtype=EMBEDDING_STORAGE_DTYPE).tobytes()
+
+
+def decode_embedding(payload: bytes) -> np.ndarray:
+    """
+    Unpack an embedding stored by encode_embedding().
+
+    Args:
+        payload: Raw float16 bytes
+
+    Returns:
+        float32 numpy vector
+    """
+    return np.frombuffer(payload, dtype=EMBEDDING_STORAGE_DTYPE).astype(np.float32)
+
 
 def build_similarity_matrix(embeddings: List[List[float]]) -> List[List[float]]:
     """
     Build a symmetric similarity matrix using cosine similarity.
 
     Args:
-        embeddings: List of embedding vectors (list of floats)
+        embeddings: List of embedding vectors (list of floats), or a 2D
+            array; float32 C-contiguous arrays are used without conversion
 
     Returns:
         A 2D list (similarity matrix) where:
@@ -33,31 +164,168 @@ def build_similarity_matrix(embeddings: List[List[float]]) -> List[List[float]]:
         >>> build_similarity_matrix([[1.0, 0.0], [1.0, 0.0]])
         [[1.0, 1.0], [1.0, 1.0]]
     """
-    if not embeddings:
+    n = len(embeddings)
+    if n == 0:
         return []
+    if n == 1:
+        # Self-similarity only; no array work needed
+        return [[1.0]]
+
+    # Convert to Python list of lists (JSON-serializable)
+    return _similarity_array(embeddings).tolist()
 
-    n = len(embeddings)
-    # Convert to numpy array for efficient computation
-    embeddings_array = np.array(embeddings, dtype=np.float64)
 
-    # Compute cosine similarity matrix
-    # Cosine similarity = (a . b) / (||a|| * ||b||)
-    # Using numpy's efficient operations
-    norms = np.linalg.norm(embeddings_array, axis=1)
-    # Avoid division by zero for zero vectors
-    norms = np.where(norms == 0, 1, norms)
+def _to_matrix(embeddings) -> np.ndarray:
+    """
+    Embeddings as a C-contiguous float32 (n, d) array.
 
-    # Normalize embeddings
-    normalized = embeddings_array / norms[:, np.newaxis]
+    A float32 C-contiguous array is returned as-is; lists of lists (and other
+    dtypes or layouts) are converted once.
 
-    # Compute similarity matrix via dot product
-    similarity_matrix = np.dot(normalized, normalized.T)
+    Args:
+        embeddings: Sequence of embedding vectors or 2D array
+
+    Returns:
+        float32 C-contiguous 2D array
+    """
+    return np.ascontiguousarray(embeddings, dtype=np.float32)
 
-    # Ensure diagonal is exactly 1.0 (handles potential floating point issues)
+
+def _similarity_array(embeddings) -> np.ndarray:
+    """
+    Cosine similarity matrix as a float32 array (see build_similarity_matrix).
+
+    Args:
+        embeddings: Non-empty sequence or 2D array of embedding vectors
+
+    Returns:
+        (n, n) float32 array, symmetric, diagonal 1.0, values in [-1, 1]
+    """
+    matrix = _to_matrix(embeddings)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    # Zero vectors (placeholder rows for failed embeddings) are left as-is
+    # rather than divided by zero
+    zero_rows = norms[:, 0] == 0
+    norms[zero_rows] = 1.0
+    if matrix is embeddings:
+        # The caller's own array is never modified: normalize into a new buffer
+        normalized = matrix / norms
+    else:
+        # Freshly converted buffer: L2-normalize in place
+        normalized = np.divide(matrix, norms, out=matrix)
+
+    if SIMSIMD_AVAILABLE:
+        if len(normalized) >= INT8_MIN_DOCUMENTS:
+            # Large batches: int8 codes, compared with the VNNI/DP4A kernels
+            kernel_input = np.round(normalized * INT8_SCALE).astype(np.int8)
+            # A row whose codes all round to 0 has no direction left to compare
+            zero_rows |= ~kernel_input.any(axis=1)
+        else:
+            kernel_input = normalized
+        # SIMD cosine kernel over all pairs (AVX-512/NEON where available)
+        similarity_matrix = 1.0 - np.asarray(
+            simsimd.cdist(kernel_input, kernel_input, metric="cosine"), dtype=np.float32
+        )
+        # Mirror the upper triangle so the result is exactly symmetric
+        lower = np.tril_indices(len(normalized), k=-1)
+        similarity_matrix[lower] = similarity_matrix.T[lower]
+        # The kernel scores two zero vectors as identical (distance 0); score
+        # them 0 against everything, as the GEMM paths do
+        similarity_matrix[zero_rows, :] = 0.0
+        similarity_matrix[:, zero_rows] = 0.0
+    elif len(normalized) >= TILED_MIN_DOCUMENTS:
+        similarity_matrix = _tiled_similarity(normalized)
+    else:
+        # Cosine similarity of unit vectors is their dot product: one GEMM
+        # (NumPy computes X @ X.T as a symmetric rank-k update, so the result
+        # is exactly symmetric)
+        similarity_matrix = normalized @ normalized.T
+
+    # Clamp rounding overshoot and make the diagonal exactly 1.0
+    np.clip(similarity_matrix, -1.0, 1.0, out=similarity_matrix)
     np.fill_diagonal(similarity_matrix, 1.0)
 
-    # Convert to Python list of lists (JSON-serializable)
-    return similarity_matrix.tolist()
+    return similarity_matrix
+
+
+def _tiled_similarity(normalized: np.ndarray, block: int = SIMILARITY_TILE_ROWS) -> np.ndarray:
+    """
+    X @ X.T for row-normalized X, computed one tile of rows at a time.
+
+    Each tile only multiplies against the rows from its own onward (the
+    upper block triangle) and is mirrored into the lower one, which halves
+    the work and keeps the result exactly symmetric.
+
+    Args:
+        normalized: (n, d) float32 C-contiguous array of unit rows
+        block: Rows per tile
+
+    Returns:
+        (n, n) float32 similarity matrix
+    """
+    n = len(normalized)
+    out = np.empty((n, n), dtype=np.float32)
+    # One flat scratch buffer, reshaped per tile so np.dot can write into a
+    # C-contiguous view without reallocating
+    scratch = np.empty(min(block, n) * n, dtype=np.float32)
+    for start in range(0, n, block):
+        stop = min(start + block, n)
+        rows = stop - start
+        tile = scratch[:rows * (n - start)].reshape(rows, n - start)
+        np.dot(normalized[start:stop], normalized[start:].T, out=tile)
+
+        # Diagonal block: keep its upper triangle and mirror it
+        diagonal = tile[:, :rows]
+        lower = np.tril_indices(rows, k=-1)
+        diagonal[lower] = diagonal.T[lower]
+
+        out[start:stop, start:] = tile
+        # Off-diagonal part of the tile fills the matching columns below it
+        out[stop:, start:stop] = tile[:, rows:].T
+    return out
+
+
+def _connected_components(adjacency: np.ndarray) -> np.ndarray:
+    """
+    Label the connected components of an undirected boolean adjacency matrix.
+
+    Labels are numbered in order of each component's lowest index.
+
+    Args:
+        adjacency: (n, n) symmetric boolean matrix
+
+    Returns:
+        int array of length n with a component label per node
+    """
+    if SCIPY_AVAILABLE:
+        # C-level traversal of the threshold graph
+        _, labels = connected_components(csr_matrix(adjacency), directed=False)
+        return labels
+
+    if NUMBA_AVAILABLE:
+        # Compiled union-find over the pairwise threshold checks
+        return _union_find_kernel(np.ascontiguousarray(adjacency))
+
+    # Fallback: union-find over the above-threshold edges
+    n = len(adjacency)
+    parent = list(range(n))
+
+    def find(x: int) -> int:
+        """Find root of x with path halving."""
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    rows, cols = np.nonzero(np.triu(adjacency, k=1))
+    for i, j in zip(rows.tolist(), cols.tolist()):
+        root_i, root_j = find(i), find(j)
+        if root_i != root_j:
+            # Keep the lower index as root so labels follow first appearance
+            parent[max(root_i, root_j)] = min(root_i, root_j)
+
+    roots = [find(x) for x in range(n)]
+    return np.unique(roots, return_inverse=True)[1]
 
 
 def cluster_documents(
@@ -89,60 +357,64 @@ def cluster_documents(
         >>> cluster_documents([[1.0, 0.0], [1.0, 0.0]], threshold=0.5)
         [{'cluster_id': 0, 'document_ids': [0, 1], 'avg_similarity': 1.0}]
     """
-    if not embeddings:
+    n = len(embeddings)
+    if n == 0:
         return []
+    if n == 1:
+        # A lone document is its own cluster
+        return [{"cluster_id": 0, "document_ids": [0], "avg_similarity": 1.0}]
 
-    n = len(embeddings)
+    # Similarity matrix kept as an array (no list round-trip)
+    return cluster_from_matrix(_similarity_array(embeddings), threshold)
 
-    # Build similarity matrix
-    similarity_matrix = build_similarity_matrix(embeddings)
 
-    # Union-Find data structure for efficient clustering
-    parent = list(range(n))
+def cluster_from_matrix(similarity_matrix, threshold: float = 0.85) -> List[Dict]:
+    """
+    Cluster documents from an already computed similarity matrix.
 
-    def find(x: int) -> int:
-        """Find root of x with path compression."""
-        if parent[x] != x:
-            parent[x] = find(parent[x])
-        return parent[x]
-
-    def union(x: int, y: int) -> None:
-        """Union the sets containing x and y."""
-        root_x = find(x)
-        root_y = find(y)
-        if root_x != root_y:
-            parent[root_y] = root_x
-
-    # Group documents by threshold
-    for i in range(n):
-        for j in range(i + 1, n):
-            if similarity_matrix[i][j] >= threshold:
-                union(i, j)
-
-    # Group documents by their root
-    clusters_map: Dict[int, List[int]] = {}
-    for doc_id in range(n):
-        root = find(doc_id)
-        if root not in clusters_map:
-            clusters_map[root] = []
-        clusters_map[root].append(doc_id)
+    Same clustering as cluster_documents(), for callers that have the
+    matrix from build_similarity_matrix() and shouldn't recompute it.
+
+    Args:
+        similarity_matrix: (n, n) pairwise similarity matrix (2D list or array)
+        threshold: Minimum similarity for grouping (default 0.85)
+
+    Returns:
+        List of cluster dictionaries with cluster_id, document_ids,
+        and avg_similarity (see cluster_documents)
+    """
+    similarity_matrix = np.asarray(similarity_matrix)
+    if similarity_matrix.size == 0:
+        return []
+
+    # Clusters are the connected components of the graph linking pairs at
+    # or above the threshold
+    labels = _connected_components(similarity_matrix >= threshold)
+
+    # Group document indices by label (labels follow each cluster's first document)
+    order = np.argsort(labels, kind="stable")
+    boundaries = np.flatnonzero(np.diff(labels[order])) + 1
+    clusters = [group.tolist() for group in np.split(order, boundaries)]
+
+    # Average similarity within each cluster (each pair counted once)
+    if NUMBA_AVAILABLE:
+        offsets = np.concatenate(([0], boundaries, [len(order)]))
+        avg_similarities = _cluster_average_kernel(
+            np.ascontiguousarray(similarity_matrix), order, offsets
+        ).tolist()
+    else:
+        avg_similarities = [
+            float(
+                similarity_matrix[np.ix_(ids, ids)][np.triu_indices(len(ids), k=1)]
+                .mean(dtype=np.float64)
+            ) if len(ids) > 1 else 1.0  # Single document cluster
+            for ids in clusters
+        ]
 
     # Build result with cluster info
     result = []
     cluster_id = 0
-    for root, document_ids in clusters_map.items():
-        # Calculate average similarity within cluster
-        cluster_similarities = []
-        for i in document_ids:
-            for j in document_ids:
-                if i < j:  # Count each pair once
-                    cluster_similarities.append(similarity_matrix[i][j])
-
-        if cluster_similarities:
-            avg_similarity = float(np.mean(cluster_similarities))
-        else:
-            avg_similarity = 1.0  # Single document cluster
-
+    for document_ids, avg_similarity in zip(clusters, avg_similarities):
         result.append({
             "cluster_id": cluster_id,
             "document_ids": document_ids,
@@ -183,6 +455,49 @@ def summarize_clusters(
     return clusters
 
 
+def analyze_batch(embeddings, threshold: float = 0.85) -> Dict:
+    """
+    Similarity matrix, clusters and cluster summary in one pass.
+
+    The similarity matrix is computed once and returned as a float32 array
+    (4 bytes per entry instead of a Python float object); convert it with
+    .tolist() only where plain lists are needed, such as a JSON response.
+    BatchAnalysisJob.similarity_matrix stores the array as-is.
+
+    Args:
+        embeddings: List of embedding vectors or 2D array
+        threshold: Minimum similarity for grouping (default 0.85)
+
+    Returns:
+        Dict with:
+        - similarity_matrix: (n, n) float32 array, same values as
+          build_similarity_matrix()
+        - clusters: List of cluster dictionaries, as from cluster_documents()
+        - summary: List of cluster summaries, as from summarize_clusters()
+
+    Examples:
+        >>> analyze_batch([[1.0, 0.0], [1.0, 0.0]], threshold=0.5)
+        {'similarity_matrix': array([[1., 1.], [1., 1.]], dtype=float32),
+         'clusters': [{'cluster_id': 0, 'document_ids': [0, 1], 'avg_similarity': 1.0}],
+         'summary': [{'cluster_id': 0, 'document_ids': [0, 1], 'avg_similarity': 1.0}]}
+    """
+    if len(embeddings) == 0:
+        return {
+            "similarity_matrix": np.empty((0, 0), dtype=np.float32),
+            "clusters": [],
+            "summary": [],
+        }
+
+    similarity_matrix = _similarity_array(embeddings)
+    clusters = cluster_from_matrix(similarity_matrix, threshold)
+
+    return {
+        "similarity_matrix": similarity_matrix,
+        "clusters": clusters,
+        "summary": summarize_clusters(similarity_matrix, clusters),
+    }
+
+
 class BatchAnalysisService:
     """
     Service for batch document analysis operations.
@@ -225,6 +540,24 @@ class BatchAnalysisService:
         """
         return cluster_documents(embeddings, threshold)
 
+    def cluster_from_matrix(
+        self,
+        similarity_matrix: List[List[float]],
+        threshold: float = 0.85
+    ) -> List[Dict]:
+        """
+        Cluster documents from a precomputed similarity matrix.
+
+        Args:
+            similarity_matrix: Pairwise similarity matrix
+            threshold: Minimum similarity for clustering (default 0.85)
+
+        Returns:
+            List of cluster dictionaries with cluster_id, document_ids,
+            and avg_similarity
+        """
+        return cluster_from_matrix(similarity_matrix, threshold)
+
     def summarize_clusters(
         self,
         similarity_matrix: List[List[float]],
@@ -242,6 +575,23 @@ class BatchAnalysisService:
         """
         return summarize_clusters(similarity_matrix, clusters)
 
+    def analyze_batch(
+        self,
+        embeddings: List[List[float]],
+        threshold: float = 0.85
+    ) -> Dict:
+        """
+        Build the similarity matrix, cluster and summarize in one pass.
+
+        Args:
+            embeddings: List of embedding vectors
+            threshold: Minimum similarity for clustering (default 0.85)
+
+        Returns:
+            Dict with similarity_matrix (float32 array), clusters and summary
+        """
+        return analyze_batch(embeddings, threshold)
+
 
 # Global service instance
 _batch_analysis_service = None
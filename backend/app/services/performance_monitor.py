@@ -8,12 +8,15 @@ Uses exponential moving average for smooth weight transitions and
 prevents rapid weight changes from noisy data.
 """
 
+import heapq
 import json
 import os
+import threading
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass, asdict
-from collections import defaultdict
+from collections import defaultdict, deque
+from itertools import islice
 
 try:
     import numpy as np
@@ -21,12 +24,27 @@ try:
 except ImportError:
     NUMPY_AVAILABLE = False
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = NUMPY_AVAILABLE
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+import structlog
 from sqlalchemy.orm import Session
 from sqlalchemy import desc, func
 
 from app.models.database import get_db
 from app.ml.ensemble.weights import default_model_weights, update_weights_with_performance
 
+logger = structlog.get_logger(__name__)
+
 
 # Default minimum predictions before updating weights
 MIN_PREDICTIONS_FOR_UPDATE = 100
@@ -37,10 +55,87 @@ MIN_MODEL_WEIGHT = 0.1
 # Exponential moving average smoothing factor
 EMA_ALPHA = 0.3  # Higher = more responsive to new data
 
+# Maximum prediction records held in memory (oldest are evicted first)
+MAX_IN_MEMORY_PREDICTIONS = 10000
+
+# Number of most recent records written to persistent storage
+MAX_PERSISTED_PREDICTIONS = 1000
+
+# Persist after this many newly tracked predictions
+SAVE_INTERVAL = 50
+
+# Default ensemble weights, computed once (treat as read-only)
+_DEFAULT_WEIGHTS = default_model_weights()
+
+# Models tracked by the monitor, in reporting order
+TRACKED_MODELS = ('stylometric', 'perplexity', 'contrastive', 'ensemble')
+
+# O(1) membership check for model-name validation on the prediction path
+_VALID_MODELS = frozenset(TRACKED_MODELS)
+
+# Reference point for integer (microsecond) timestamps in storage
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _to_epoch_us(ts: datetime) -> int:
+    """Convert a naive UTC datetime to integer microseconds since epoch."""
+    return (ts - _EPOCH) // timedelta(microseconds=1)
+
+
+def _from_epoch_us(value) -> datetime:
+    """Convert a stored timestamp back to a naive UTC datetime."""
+    if isinstance(value, str):
+        # Legacy storage format used ISO 8601 strings
+        return datetime.fromisoformat(value)
+    return _EPOCH + timedelta(microseconds=value)
+
+
+def _decode_timestamps(values: List) -> List[datetime]:
+    """
+    Convert a batch of stored timestamps to naive UTC datetimes.
+
+    Integer timestamps are converted in a single vectorized datetime64 cast
+    when numpy is available; legacy ISO strings fall back to per-value parsing.
+    """
+    if NUMPY_AVAILABLE and values and all(isinstance(v, int) for v in values):
+        return np.array(values, dtype=np.int64).astype('datetime64[us]').tolist()
+    return [_from_epoch_us(v) for v in values]
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, fastmath=True)
+    def _brier_kernel(probs, labels):
+        """Mean squared error between probabilities and 0/1 labels."""
+        n = probs.shape[0]
+        if n == 0:
+            return 1.0
+        total = 0.0
+        for i in range(n):
+            diff = probs[i] - labels[i]
+            total += diff * diff
+        return total / n
+
+    @njit(cache=True, fastmath=True)
+    def _reliability_kernel(probs, labels, n_bins):
+        """Per-bin sums of predictions/labels and counts in a single pass."""
+        sum_pred = np.zeros(n_bins)
+        sum_actual = np.zeros(n_bins)
+        counts = np.zeros(n_bins, dtype=np.int64)
+        for i in range(probs.shape[0]):
+            p = probs[i]
+            if p < 0.0 or p > 1.0:
+                continue
+            # Upper bound is inclusive for the last bin
+            b = min(int(p * n_bins), n_bins - 1)
+            sum_pred[b] += p
+            sum_actual[b] += labels[i]
+            counts[b] += 1
+        return sum_pred, sum_actual, counts
+
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ModelPerformanceRecord:
-    """Single prediction record for performance tracking."""
+    """Single prediction record for performance tracking (immutable, slotted)."""
     model_name: str
     predicted_prob: float
     actual_label: int  # 0 = human, 1 = AI
@@ -79,12 +174,17 @@ class PerformanceMonitor:
         self.min_weight = min_weight
         self.ema_alpha = ema_alpha
 
-        # In-memory prediction storage
-        self._predictions: List[ModelPerformanceRecord] = []
+        # In-memory prediction storage (bounded ring buffer)
+        self._predictions: deque = deque(maxlen=MAX_IN_MEMORY_PREDICTIONS)
+        self._unsaved_count = 0
 
         # EMA tracking for smooth accuracy estimates
         self._ema_accuracy: Dict[str, float] = {}
 
+        # Memoized ensemble weights, recomputed only after new predictions
+        self._weights_cache: Optional[Dict[str, float]] = None
+        self._weights_dirty = True
+
         # Load persisted data if available
         self._load_from_storage()
 
@@ -109,10 +209,68 @@ class PerformanceMonitor:
         Returns:
             True if recorded successfully
         """
-        if model_name not in ['stylometric', 'perplexity', 'contrastive', 'ensemble']:
-            print(f"Warning: Unknown model name: {model_name}")
+        if model_name not in _VALID_MODELS:
+            logger.warning("Unknown model name", model_name=model_name)
             return False
 
+        self._record(
+            model_name, predicted_prob, actual_label,
+            datetime.utcnow(), document_id, user_id
+        )
+
+        # Persist if we have enough records
+        self._unsaved_count += 1
+        if self._unsaved_count >= SAVE_INTERVAL:
+            self._save_to_storage()
+
+        return True
+
+    def track_batch(
+        self,
+        model_probs: Dict[str, float],
+        actual_label: int,
+        document_id: Optional[int] = None,
+        user_id: Optional[int] = None
+    ) -> int:
+        """
+        Record predictions from several models for the same document.
+
+        Validates all names up front, shares one timestamp across records,
+        and checks the persistence threshold once for the whole batch.
+
+        Args:
+            model_probs: Dict of model names to predicted AI probabilities
+            actual_label: Ground truth label (0=human, 1=AI)
+            document_id: Optional document ID for reference
+            user_id: Optional user ID for user-specific tracking
+
+        Returns:
+            Number of predictions recorded (unknown model names are skipped)
+        """
+        timestamp = datetime.utcnow()
+        recorded = 0
+
+        for model_name, prob in model_probs.items():
+            if model_name in _VALID_MODELS:
+                self._record(model_name, prob, actual_label, timestamp, document_id, user_id)
+                recorded += 1
+
+        self._unsaved_count += recorded
+        if self._unsaved_count >= SAVE_INTERVAL:
+            self._save_to_storage()
+
+        return recorded
+
+    def _record(
+        self,
+        model_name: str,
+        predicted_prob: float,
+        actual_label: int,
+        timestamp: datetime,
+        document_id: Optional[int],
+        user_id: Optional[int]
+    ) -> None:
+        """Append a validated prediction and update that model's EMA accuracy."""
         # Determine if prediction was correct
         predicted_label = 1 if predicted_prob > 0.5 else 0
         was_correct = (predicted_label == actual_label)
@@ -121,13 +279,14 @@ class PerformanceMonitor:
             model_name=model_name,
             predicted_prob=float(predicted_prob),
             actual_label=int(actual_label),
-            timestamp=datetime.utcnow(),
+            timestamp=timestamp,
             document_id=document_id,
             user_id=user_id,
             was_correct=was_correct
         )
 
         self._predictions.append(record)
+        self._weights_dirty = True
 
         # Update EMA for this model
         if model_name not in self._ema_accuracy:
@@ -139,12 +298,6 @@ class PerformanceMonitor:
                 (1 - self.ema_alpha) * self._ema_accuracy[model_name]
             )
 
-        # Persist if we have enough records
-        if len(self._predictions) % 50 == 0:
-            self._save_to_storage()
-
-        return True
-
     def get_model_stats(self, model_name: Optional[str] = None) -> Dict:
         """
         Get performance statistics for one or all models.
@@ -155,7 +308,7 @@ class PerformanceMonitor:
         Returns:
             Dict with model statistics
         """
-        model_names = [model_name] if model_name else ['stylometric', 'perplexity', 'contrastive', 'ensemble']
+        model_names = [model_name] if model_name else TRACKED_MODELS
 
         stats = {}
         for name in model_names:
@@ -202,9 +355,15 @@ class PerformanceMonitor:
         Uses EMA accuracy for smooth transitions. Enforces minimum weight
         per model to prevent any model from being zeroed out.
 
+        Results are memoized until the next tracked prediction, so repeated
+        calls on the prediction path skip the stats rebuild.
+
         Returns:
             Dict of updated weights {stylometric: w1, perplexity: w2, ...}
         """
+        if not self._weights_dirty and self._weights_cache is not None:
+            return dict(self._weights_cache)
+
         stats = self.get_model_stats()
 
         # Get EMA accuracies for base models only
@@ -220,17 +379,16 @@ class PerformanceMonitor:
                 accuracies[name] = model_stats.get('ema_accuracy', 0.5)
             else:
                 # Use default weight component if insufficient data
-                defaults = default_model_weights()
                 # Map default weights to pseudo-accuracy
                 # Higher default weight = higher assumed accuracy
-                accuracies[name] = 0.5 + (defaults.get(name, 0.33) - 0.33) * 0.5
+                accuracies[name] = 0.5 + (_DEFAULT_WEIGHTS.get(name, 0.33) - 0.33) * 0.5
 
         # Calculate initial weights from accuracies
         total = sum(accuracies.values())
         if total > 0:
             weights = {k: v / total for k, v in accuracies.items()}
         else:
-            weights = default_model_weights()
+            weights = dict(_DEFAULT_WEIGHTS)
 
         # Enforce minimum weight constraint
         for name in weights:
@@ -242,7 +400,10 @@ class PerformanceMonitor:
         if total > 0:
             weights = {k: v / total for k, v in weights.items()}
 
-        return weights
+        self._weights_cache = weights
+        self._weights_dirty = False
+
+        return dict(weights)
 
     def calculate_brier_score(self, model_name: str) -> float:
         """
@@ -264,7 +425,11 @@ class PerformanceMonitor:
         if not model_predictions:
             return 1.0  # Worst possible score if no data
 
-        if NUMPY_AVAILABLE:
+        if NUMBA_AVAILABLE:
+            probs = np.array([p.predicted_prob for p in model_predictions], dtype=np.float64)
+            labels = np.array([p.actual_label for p in model_predictions], dtype=np.float64)
+            return float(_brier_kernel(probs, labels))
+        elif NUMPY_AVAILABLE:
             probs = np.array([p.predicted_prob for p in model_predictions])
             labels = np.array([p.actual_label for p in model_predictions])
             return float(np.mean((probs - labels) ** 2))
@@ -296,9 +461,6 @@ class PerformanceMonitor:
         if not model_predictions:
             return {}
 
-        # Sort by predicted probability
-        sorted_preds = sorted(model_predictions, key=lambda p: p.predicted_prob)
-
         # Create bins
         bin_edges = [i / n_bins for i in range(n_bins + 1)]
         bin_centers = [(bin_edges[i] + bin_edges[i + 1]) / 2 for i in range(n_bins)]
@@ -312,6 +474,27 @@ class PerformanceMonitor:
             'count': []
         }
 
+        if NUMBA_AVAILABLE:
+            # Single-pass binning in the JIT kernel
+            probs = np.array([p.predicted_prob for p in model_predictions], dtype=np.float64)
+            labels = np.array([p.actual_label for p in model_predictions], dtype=np.float64)
+            sum_pred, sum_actual, counts = _reliability_kernel(probs, labels, n_bins)
+
+            for i in range(n_bins):
+                count = int(counts[i])
+                if count:
+                    bin_data['mean_predicted'].append(float(sum_pred[i] / count))
+                    bin_data['mean_actual'].append(float(sum_actual[i] / count))
+                else:
+                    bin_data['mean_predicted'].append(float(bin_centers[i]))
+                    bin_data['mean_actual'].append(0.0)
+                bin_data['count'].append(count)
+
+            return bin_data
+
+        # Sort by predicted probability
+        sorted_preds = sorted(model_predictions, key=lambda p: p.predicted_prob)
+
         # Calculate statistics for each bin
         for i in range(n_bins):
             lower = bin_edges[i]
@@ -354,13 +537,15 @@ class PerformanceMonitor:
         Returns:
             List of prediction records as dicts
         """
-        predictions = [p for p in self._predictions if p.model_name == model_name]
-
-        if since:
-            predictions = [p for p in predictions if p.timestamp >= since]
-
-        # Sort by timestamp descending and limit
-        predictions = sorted(predictions, key=lambda p: p.timestamp, reverse=True)[:limit]
+        # Select the most recent matching records without sorting everything
+        predictions = heapq.nlargest(
+            limit,
+            (
+                p for p in self._predictions
+                if p.model_name == model_name and (since is None or p.timestamp >= since)
+            ),
+            key=lambda p: p.timestamp
+        )
 
         return [
             {
@@ -386,10 +571,14 @@ class PerformanceMonitor:
         cutoff = datetime.utcnow() - timedelta(days=days_to_keep)
         initial_count = len(self._predictions)
 
-        self._predictions = [p for p in self._predictions if p.timestamp > cutoff]
+        self._predictions = deque(
+            (p for p in self._predictions if p.timestamp > cutoff),
+            maxlen=MAX_IN_MEMORY_PREDICTIONS
+        )
 
         removed_count = initial_count - len(self._predictions)
         if removed_count > 0:
+            self._weights_dirty = True
             self._save_to_storage()
 
         return removed_count
@@ -426,31 +615,37 @@ class PerformanceMonitor:
             return
 
         try:
-            with open(storage_path, 'r') as f:
-                data = json.load(f)
+            with open(storage_path, 'rb') as f:
+                data = orjson.loads(f.read()) if ORJSON_AVAILABLE else json.load(f)
 
             # Load EMA values
             self._ema_accuracy = data.get('ema_accuracy', {})
 
-            # Load predictions (limit to most recent to avoid memory issues)
+            # Load predictions (limit to most recent to avoid memory issues).
+            # Iterate the tail lazily rather than copying a slice of the list.
             predictions_data = data.get('predictions', [])
-            max_predictions = 10000  # Limit in-memory storage
+            start = max(0, len(predictions_data) - MAX_IN_MEMORY_PREDICTIONS)
+            timestamps = _decode_timestamps(
+                [pred['timestamp'] for pred in islice(predictions_data, start, None)]
+            )
 
-            for pred in predictions_data[-max_predictions:]:
-                self._predictions.append(ModelPerformanceRecord(
+            self._predictions.extend(
+                ModelPerformanceRecord(
                     model_name=pred['model_name'],
                     predicted_prob=pred['predicted_prob'],
                     actual_label=pred['actual_label'],
-                    timestamp=datetime.fromisoformat(pred['timestamp']),
+                    timestamp=timestamp,
                     document_id=pred.get('document_id'),
                     user_id=pred.get('user_id'),
                     was_correct=pred.get('was_correct')
-                ))
+                )
+                for pred, timestamp in zip(islice(predictions_data, start, None), timestamps)
+            )
 
-            print(f"Loaded {len(self._predictions)} prediction records from storage")
+            logger.info("Loaded performance records", count=len(self._predictions))
 
         except Exception as e:
-            print(f"Error loading performance data: {e}")
+            logger.error("Error loading performance data", error=str(e))
 
     def _save_to_storage(self) -> None:
         """Save prediction records to persistent storage."""
@@ -460,18 +655,19 @@ class PerformanceMonitor:
             # Ensure directory exists
             os.makedirs(os.path.dirname(storage_path), exist_ok=True)
 
-            # Prepare data for serialization
+            # Prepare data for serialization (only the most recent records)
+            start = max(0, len(self._predictions) - MAX_PERSISTED_PREDICTIONS)
             predictions_data = [
                 {
                     'model_name': p.model_name,
                     'predicted_prob': p.predicted_prob,
                     'actual_label': p.actual_label,
-                    'timestamp': p.timestamp.isoformat(),
+                    'timestamp': _to_epoch_us(p.timestamp),
                     'document_id': p.document_id,
                     'user_id': p.user_id,
                     'was_correct': p.was_correct
                 }
-                for p in self._predictions[-1000:]  # Only save most recent 1000
+                for p in islice(self._predictions, start, None)
             ]
 
             data = {
@@ -480,11 +676,18 @@ class PerformanceMonitor:
                 'last_saved': datetime.utcnow().isoformat()
             }
 
-            with open(storage_path, 'w') as f:
-                json.dump(data, f, indent=2)
+            if ORJSON_AVAILABLE:
+                payload = orjson.dumps(data)
+            else:
+                payload = json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+            with open(storage_path, 'wb') as f:
+                f.write(payload)
+
+            self._unsaved_count = 0
 
         except Exception as e:
-            print(f"Error saving performance data: {e}")
+            logger.error("Error saving performance data", error=str(e))
 
     def _get_storage_path(self) -> str:
         """Get the file path for persistent storage."""
@@ -496,13 +699,16 @@ class PerformanceMonitor:
 
 # Global monitor instance
 _performance_monitor: Optional[PerformanceMonitor] = None
+_performance_monitor_lock = threading.Lock()
 
 
 def get_performance_monitor() -> PerformanceMonitor:
-    """Get or create the global performance monitor instance."""
+    """Get or create the global performance monitor instance (thread-safe)."""
     global _performance_monitor
     if _performance_monitor is None:
-        _performance_monitor = PerformanceMonitor()
+        with _performance_monitor_lock:
+            if _performance_monitor is None:
+                _performance_monitor = PerformanceMonitor()
     return _performance_monitor
 
 
@@ -524,16 +730,12 @@ def track_ensemble_prediction(
         user_id: Optional user ID
     """
     monitor = get_performance_monitor()
-
-    for model_name, prob in model_probs.items():
-        if model_name in ['stylometric', 'perplexity', 'contrastive', 'ensemble']:
-            monitor.track_prediction(
-                model_name=model_name,
-                predicted_prob=prob,
-                actual_label=actual_label,
-                document_id=document_id,
-                user_id=user_id
-            )
+    monitor.track_batch(
+        model_probs,
+        actual_label=actual_label,
+        document_id=document_id,
+        user_id=user_id
+    )
 
 
 def get_current_weights() -> Dict[str, float]:
@@ -3,15 +3,66 @@ Celery tasks for batch document analysis processing.
 """
 from app.celery_app import celery_app
 from app.services.analysis_service import get_analysis_service
-from app.services.batch_analysis_service import get_batch_analysis_service
+from app.services.batch_analysis_service import get_batch_analysis_service, encode_embedding
 from app.models.database import SessionLocal, BatchAnalysisJob, BatchDocument
 from app.models.schemas import BatchJobStatus, BatchDocumentStatus
-from app.ml.ollama_embeddings import get_ollama_embedding
+from app.utils.cache import text_hash, get_cached_analyses
+from app.ml.ollama_embeddings import (
+    get_ollama_embeddings,
+    get_embedding_dim,
+    EMBEDDING_BATCH_SIZE,
+)
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 import logging
+import os
+
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# Worker threads used to overlap per-document analysis (I/O-bound on Ollama)
+BATCH_ANALYSIS_WORKERS = int(os.getenv("BATCH_ANALYSIS_WORKERS", "4"))
+
+
+def _analyze_document(analysis_service, text: str, granularity: str) -> dict:
+    """
+    Analyze a single document and return the fields to persist.
+
+    Runs in a worker thread, so it must not touch the database session;
+    all ORM writes happen on the task's main thread.
+    """
+    result = analysis_service.analyze_text(
+        text=text,
+        granularity=granularity,
+        use_cache=True
+    )
+    return _document_fields(result)
+
+
+def _serialize_segments(segments: list) -> list:
+    """
+    Return heat map segments as JSON-ready dicts.
+
+    AnalysisService produces plain dicts, so the common case is a single
+    list copy; Pydantic models are only dumped when actually present.
+    """
+    if not segments or not hasattr(segments[0], "model_dump"):
+        return list(segments)
+    return [s.model_dump(mode="json") for s in segments]
+
+
+def _document_fields(result: dict) -> dict:
+    """Extract the BatchDocument fields from an analysis result."""
+    return {
+        "ai_probability": result.get("overall_ai_probability"),
+        "confidence_distribution": result.get("confidence_distribution"),
+        "heat_map_data": {
+            "segments": _serialize_segments(result.get("segments", [])),
+            "overall_ai_probability": result.get("overall_ai_probability")
+        },
+    }
+
 
 @celery_app.task(name="app.tasks.process_batch_job")
 def process_batch_job(job_id: int) -> dict:
@@ -36,23 +87,38 @@ def process_batch_job(job_id: int) -> dict:
     batch_service = get_batch_analysis_service()
 
     try:
-        # Get the job
-        job = db.query(BatchAnalysisJob).filter(BatchAnalysisJob.id == job_id).first()
+        # Claim the job: only a PENDING row can be locked, and a row another
+        # worker is holding is skipped rather than waited on. The status moves
+        # to PROCESSING in the same transaction, so once it commits no other
+        # worker can claim the job again.
+        job = db.query(BatchAnalysisJob).filter(
+            BatchAnalysisJob.id == job_id,
+            BatchAnalysisJob.status == BatchJobStatus.PENDING
+        ).with_for_update(skip_locked=True).first()
         if not job:
-            logger.error(f"Batch job {job_id} not found")
-            return {"job_id": job_id, "status": "error", "error": "Job not found"}
+            exists = db.query(BatchAnalysisJob.id).filter(
+                BatchAnalysisJob.id == job_id
+            ).first()
+            if exists is None:
+                logger.error(f"Batch job {job_id} not found")
+                return {"job_id": job_id, "status": "error", "error": "Job not found"}
+            logger.info(f"Batch job {job_id} already claimed by another worker")
+            return {"job_id": job_id, "status": "already_claimed"}
 
         # Update status to processing
         job.status = BatchJobStatus.PROCESSING
         job.started_at = datetime.utcnow()
         db.commit()
 
-        # Get all documents for this job
-        documents = db.query(BatchDocument).filter(
-            BatchDocument.job_id == job_id
-        ).order_by(BatchDocument.id).all()
+        # Get document IDs only; full rows (with potentially large text_content)
+        # are loaded one chunk at a time below
+        document_ids = [
+            row.id for row in db.query(BatchDocument.id).filter(
+                BatchDocument.job_id == job_id
+            ).order_by(BatchDocument.id)
+        ]
 
-        if not documents:
+        if not document_ids:
             logger.warning(f"No documents found for job {job_id}")
             job.status = BatchJobStatus.COMPLETED
             job.completed_at = datetime.utcnow()
@@ -65,74 +131,102 @@ def process_batch_job(job_id: int) -> dict:
                 "processed_documents": 0
             }
 
-        # Store embeddings and results
-        embeddings = []
+        # Embeddings are written straight into one preallocated, contiguous
+        # float32 matrix (row i = document_ids[i]); it is allocated once the
+        # first embedding reveals the model's dimension. Rows left zero act
+        # as placeholders for documents without an embedding.
+        embedding_matrix = None
         document_results = []
-
-        for doc in documents:
-            try:
-                # Update document status
-                doc.status = BatchDocumentStatus.PROCESSING
+        granularity = job.granularity
+
+        # Process documents in chunks: analyses run concurrently on a thread
+        # pool while one batched Ollama request embeds the whole chunk
+        with ThreadPoolExecutor(max_workers=BATCH_ANALYSIS_WORKERS) as executor:
+            for start in range(0, len(document_ids), EMBEDDING_BATCH_SIZE):
+                chunk = db.query(BatchDocument).filter(
+                    BatchDocument.id.in_(document_ids[start:start + EMBEDDING_BATCH_SIZE])
+                ).order_by(BatchDocument.id).all()
+
+                # Mark the whole chunk as processing with a single commit
+                for doc in chunk:
+                    doc.status = BatchDocumentStatus.PROCESSING
                 db.commit()
 
-                # Analyze the document
-                result = analysis_service.analyze_text(
-                    text=doc.text_content,
-                    granularity=job.granularity,
-                    use_cache=True
+                # Fetch cached analyses for the chunk in one Redis round-trip
+                # (same key as AnalysisService.analyze_text); only misses are analyzed
+                cached_results = get_cached_analyses(
+                    [text_hash(doc.text_content + granularity) for doc in chunk]
                 )
-
-                # Update document with analysis results
-                doc.ai_probability = result.get("overall_ai_probability")
-                doc.confidence_distribution = result.get("confidence_distribution")
-                doc.heat_map_data = {
-                    "segments": [s.dict() if hasattr(s, 'dict') else s for s in result.get("segments", [])],
-                    "overall_ai_probability": result.get("overall_ai_probability")
-                }
-
-                # Generate embedding for this document
-                embedding = get_ollama_embedding(doc.text_content)
-                if embedding is not None:
-                    doc.embedding = embedding
-                    embeddings.append(embedding)
-                else:
-                    # Use zero vector if embedding fails
-                    doc.embedding = None
-                    embeddings.append([0.0] * 768)  # Default embedding size
-
-                # Update document status to completed
-                doc.status = BatchDocumentStatus.COMPLETED
-                doc.cluster_id = None  # Will be set after clustering
-
-                # Update job progress
-                job.processed_documents += 1
+                pending = [
+                    _document_fields(cached) if cached else executor.submit(
+                        _analyze_document, analysis_service, doc.text_content, granularity
+                    )
+                    for doc, cached in zip(chunk, cached_results)
+                ]
+                chunk_embeddings = get_ollama_embeddings([doc.text_content for doc in chunk])
+
+                for row, (doc, embedding, item) in enumerate(
+                    zip(chunk, chunk_embeddings, pending), start=start
+                ):
+                    try:
+                        # Update document with analysis results
+                        fields = item.result() if isinstance(item, Future) else item
+                        doc.ai_probability = fields["ai_probability"]
+                        doc.confidence_distribution = fields["confidence_distribution"]
+                        doc.heat_map_data = fields["heat_map_data"]
+
+                        # Store the embedding generated for this document's chunk
+                        if embedding is not None:
+                            doc.embedding = encode_embedding(embedding)
+                            if embedding_matrix is None:
+                                embedding_matrix = np.zeros(
+                                    (len(document_ids), embedding.shape[0]), dtype=np.float32
+                                )
+                            embedding_matrix[row] = embedding
+                        else:
+                            doc.embedding = None
+
+                        # Update document status to completed
+                        doc.status = BatchDocumentStatus.COMPLETED
+                        doc.cluster_id = None  # Will be set after clustering
+
+                        # Update job progress (committed once per chunk)
+                        job.processed_documents += 1
+
+                        document_results.append({
+                            "document_id": doc.id,
+                            "ai_probability": doc.ai_probability
+                        })
+
+                        logger.info(f"Processed document {doc.id} for job {job_id}: {doc.filename}")
+
+                    except Exception as e:
+                        logger.error(f"Error processing document {doc.id}: {str(e)}")
+                        doc.status = BatchDocumentStatus.FAILED
+                        doc.error_message = str(e)
+                        job.processed_documents += 1
+
+                # Persist results and progress for this chunk in one transaction,
+                # then detach the rows so their text content can be freed
                 db.commit()
+                for doc in chunk:
+                    db.expunge(doc)
+                del chunk, pending, chunk_embeddings
 
-                document_results.append({
-                    "document_id": doc.id,
-                    "ai_probability": doc.ai_probability
-                })
-
-                logger.info(f"Processed document {doc.id} for job {job_id}: {doc.filename}")
-
-            except Exception as e:
-                logger.error(f"Error processing document {doc.id}: {str(e)}")
-                doc.status = BatchDocumentStatus.FAILED
-                doc.error_message = str(e)
-                job.processed_documents += 1
-                db.commit()
-
-                # Add placeholder embedding to maintain matrix alignment
-                embeddings.append([0.0] * 768)
+        # No embeddings at all: all-zero matrix sized to the model's dimension
+        if embedding_matrix is None:
+            embedding_matrix = np.zeros(
+                (len(document_ids), get_embedding_dim()), dtype=np.float32
+            )
 
         # Compute similarity matrix
         try:
-            if embeddings:
-                similarity_matrix = batch_service.build_similarity_matrix(embeddings)
-                job.similarity_matrix = similarity_matrix
-
-                # Cluster documents
-                clusters = batch_service.cluster_documents(embeddings, threshold=0.85)
+            if len(embedding_matrix):
+                # Similarity matrix and clusters from a single matrix build;
+                # the float32 matrix is used as-is, without list conversions
+                batch_result = batch_service.analyze_batch(embedding_matrix, threshold=0.85)
+                job.similarity_matrix = batch_result["similarity_matrix"]
+                clusters = batch_result["clusters"]
                 job.clusters = clusters
 
                 # Update cluster_id for each document
@@ -140,10 +234,18 @@ def process_batch_job(job_id: int) -> dict:
                     cluster_id = cluster.get("cluster_id")
                     document_indices = cluster.get("document_ids", [])
 
-                    # Map indices back to documents
-                    for idx in document_indices:
-                        if idx < len(documents):
-                            documents[idx].cluster_id = cluster_id
+                    # Map indices back to document IDs
+                    cluster_doc_ids = [
+                        document_ids[idx] for idx in document_indices
+                        if idx < len(document_ids)
+                    ]
+                    if cluster_doc_ids:
+                        db.query(BatchDocument).filter(
+                            BatchDocument.id.in_(cluster_doc_ids)
+                        ).update(
+                            {BatchDocument.cluster_id: cluster_id},
+                            synchronize_session=False
+                        )
 
                 db.commit()
                 logger.info(f"Computed similarity matrix and {len(clusters)} clusters for job {job_id}")
@@ -218,8 +320,8 @@ def retry_batch_job(job_id: int) -> dict:
                 "message": "No failed documents to retry"
             }
 
-        # Reset job status
-        job.status = BatchJobStatus.PROCESSING
+        # Return the job to PENDING so process_batch_job can claim it again
+        job.status = BatchJobStatus.PENDING
         db.commit()
 
         # Re-process using the main task
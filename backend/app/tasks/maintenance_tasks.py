@@ -0,0 +1,114 @@
+"""
+Periodic maintenance tasks run by Celery beat.
+
+Task names match the beat schedule in app.celery_app.
+"""
+from app.celery_app import celery_app
+from datetime import datetime, timedelta
+import structlog
+
+logger = structlog.get_logger()
+
+
+@celery_app.task(name="app.tasks.cleanup_expired_tokens")
+def cleanup_expired_tokens():
+    """Clean up expired refresh tokens and password reset tokens."""
+    from sqlalchemy import delete
+    from app.models.database import SessionLocal, RefreshToken, PasswordResetToken, EmailVerificationToken
+    
+    db = SessionLocal()
+    try:
+        now = datetime.utcnow()
+        
+        # Bulk DELETE per table without synchronizing the session (nothing is
+        # loaded), all inside a single transaction so there is one commit.
+        with db.begin():
+            # Delete expired refresh tokens
+            expired_refresh = db.execute(
+                delete(RefreshToken)
+                .where(RefreshToken.expires_at < now)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            
+            # Delete expired password reset tokens
+            expired_reset = db.execute(
+                delete(PasswordResetToken)
+                .where(PasswordResetToken.expires_at < now)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            
+            # Delete expired email verification tokens
+            expired_email = db.execute(
+                delete(EmailVerificationToken)
+                .where(EmailVerificationToken.expires_at < now)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+        
+        logger.info(
+            "Token cleanup completed",
+            expired_refresh=expired_refresh,
+            expired_reset=expired_reset,
+            expired_email=expired_email
+        )
+        
+    except Exception as e:
+        logger.error("Token cleanup failed", error=str(e))
+        db.rollback()
+    finally:
+        db.close()
+
+
+@celery_app.task(name="app.tasks.cleanup_old_analysis_results")
+def cleanup_old_analysis_results():
+    """
+    Clean up old analysis results based on retention policy.
+
+    Deletes in bounded batches, committing after each one, so a large
+    backlog never holds a long table lock or builds up one huge transaction.
+    """
+    from sqlalchemy import delete, select
+    from app.models.database import SessionLocal, AnalysisResult
+    import os
+    import time
+    
+    retention_days = int(os.getenv("ANALYSIS_RETENTION_DAYS", "90"))
+    batch_size = int(os.getenv("ANALYSIS_CLEANUP_BATCH_SIZE", "10000"))
+    
+    db = SessionLocal()
+    try:
+        cutoff_date = datetime.utcnow() - timedelta(days=retention_days)
+        deleted = 0
+        
+        while True:
+            ids = db.execute(
+                select(AnalysisResult.id)
+                .where(AnalysisResult.created_at < cutoff_date)
+                .limit(batch_size)
+            ).scalars().all()
+            if not ids:
+                break
+            
+            db.execute(
+                delete(AnalysisResult)
+                .where(AnalysisResult.id.in_(ids))
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            deleted += len(ids)
+            
+            if len(ids) < batch_size:
+                break
+            # Brief pause so replicas can catch up between batches
+            time.sleep(0.01)
+        
+        logger.info(
+            "Analysis cleanup completed",
+            deleted_count=deleted,
+            retention_days=retention_days
+        )
+        
+    except Exception as e:
+        logger.error("Analysis cleanup failed", error=str(e))
+        db.rollback()
+    finally:
+        db.close()
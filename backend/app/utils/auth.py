@@ -1,6 +1,7 @@
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import JWTError, jwt
+import jwt
+from jwt import InvalidTokenError
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status, Request, Security
 from fastapi.security import OAuth2PasswordBearer, APIKeyHeader
@@ -9,6 +10,10 @@ from app.models.database import get_db, User, RefreshToken, ApiKey
 from app.models.schemas import TokenData
 import os
 import hashlib
+import hmac
+import threading
+import time
+from collections import OrderedDict
 import bcrypt
 import secrets
 from zxcvbn import zxcvbn
@@ -23,16 +28,29 @@ REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
 MAX_FAILED_LOGIN_ATTEMPTS = int(os.getenv("MAX_FAILED_LOGIN_ATTEMPTS", "5"))
 ACCOUNT_LOCKOUT_MINUTES = int(os.getenv("ACCOUNT_LOCKOUT_MINUTES", "15"))
 MIN_PASSWORD_STRENGTH = int(os.getenv("MIN_PASSWORD_STRENGTH", "2"))  # 0-4 scale
+# bcrypt work factor (log2 of iterations); only lower it for tests
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
 
 # Configure CryptContext with bcrypt
 # We'll use bcrypt directly to avoid passlib's initialization issues
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
 api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 
 # Bcrypt has a 72-byte limit for passwords
 BCRYPT_MAX_PASSWORD_LENGTH = 72
 
+# Short-lived cache of bcrypt verification outcomes, so retried checks in
+# the same user flow skip the deliberately slow bcrypt call
+PASSWORD_VERIFY_CACHE_TTL = int(os.getenv("PASSWORD_VERIFY_CACHE_TTL", "60"))  # seconds
+PASSWORD_VERIFY_CACHE_SIZE = 1024
+
+# Per-process secret for cache keys: neither the plaintext nor a bare
+# (unsalted) digest of it is ever stored
+_verify_cache_secret = secrets.token_bytes(32)
+_verify_cache: "OrderedDict[bytes, tuple[bool, float]]" = OrderedDict()
+_verify_cache_lock = threading.Lock()
+
 
 def _prepare_password_for_bcrypt(password: str) -> bytes:
     """
@@ -43,20 +61,54 @@ def _prepare_password_for_bcrypt(password: str) -> bytes:
     """
     password_bytes = password.encode('utf-8')
     if len(password_bytes) > BCRYPT_MAX_PASSWORD_LENGTH:
-        # Hash with SHA-256 first (produces 32 bytes)
-        # This is well under 72 bytes, so bcrypt can handle it
+        # Hash with SHA-256 first (produces 32 raw bytes)
+        # This is well under 72 bytes, so bcrypt can handle it.
+        # The raw digest is the canonical pre-hash format; a hex string would
+        # be twice as long and would not verify against existing hashes.
         return hashlib.sha256(password_bytes).digest()
     # Return as-is if within limit (bcrypt handles up to 72 bytes)
     return password_bytes
 
 
+def _verify_cache_key(prepared: bytes, hashed_password: str) -> bytes:
+    """Keyed HMAC identifying a (password, stored hash) pair."""
+    return hmac.new(
+        _verify_cache_secret,
+        hashed_password.encode('utf-8') + b'\0' + prepared,
+        hashlib.sha256
+    ).digest()
+
+
+def clear_password_verification_cache() -> None:
+    """Drop all cached verification results (e.g. after a password change)."""
+    with _verify_cache_lock:
+        _verify_cache.clear()
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
     try:
         # Prepare password the same way we did during hashing
         prepared = _prepare_password_for_bcrypt(plain_password)
+
+        key = _verify_cache_key(prepared, hashed_password)
+        now = time.monotonic()
+        with _verify_cache_lock:
+            entry = _verify_cache.get(key)
+            if entry is not None and entry[1] > now:
+                _verify_cache.move_to_end(key)
+                return entry[0]
+
         # Use bcrypt directly to avoid passlib initialization issues
-        return bcrypt.checkpw(prepared, hashed_password.encode('utf-8'))
+        result = bcrypt.checkpw(prepared, hashed_password.encode('utf-8'))
+
+        with _verify_cache_lock:
+            _verify_cache[key] = (result, now + PASSWORD_VERIFY_CACHE_TTL)
+            _verify_cache.move_to_end(key)
+            while len(_verify_cache) > PASSWORD_VERIFY_CACHE_SIZE:
+                _verify_cache.popitem(last=False)
+
+        return result
     except Exception:
         # If direct bcrypt fails, return False
         # This could happen with malformed hashes or other errors
@@ -68,7 +120,7 @@ def get_password_hash(password: str) -> str:
     prepared = _prepare_password_for_bcrypt(password)
     # Use bcrypt directly to avoid passlib initialization issues
     # Generate salt and hash
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(prepared, salt)
     return hashed.decode('utf-8')
 
@@ -210,7 +262,7 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
         if email is None:
             raise credentials_exception
         token_data = TokenData(email=email)
-    except JWTError:
+    except InvalidTokenError:
         raise credentials_exception
     user = db.query(User).filter(User.email == token_data.email).first()
     if user is None:
@@ -271,7 +323,7 @@ def get_current_user_optional(request: Request, db: Session = Depends(get_db)) -
             return None
 
         return user
-    except (JWTError, Exception):
+    except (InvalidTokenError, Exception):
         return None
 
 
@@ -335,7 +387,7 @@ def get_current_user_or_api_key(
                 user = db.query(User).filter(User.email == email).first()
                 if user and user.is_active:
                     return user
-        except (JWTError, Exception):
+        except (InvalidTokenError, Exception):
             pass
 
     # Then try API key
@@ -4,21 +4,51 @@ Redis caching utilities for Ghostwriter.
 import os
 import json
 import hashlib
-from typing import Optional, Any, Callable
+from typing import Optional, Any, Callable, List
 from functools import wraps
 import structlog
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
 logger = structlog.get_logger()
 
 # Redis client (lazy initialization)
 _redis_client = None
 
 REDIS_URL = os.getenv("REDIS_URL")
+# Size the shared pool for worker concurrency (threads/greenlets per process)
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "32"))
 CACHE_TTL_FINGERPRINT = 3600  # 1 hour for fingerprints
 CACHE_TTL_ANALYSIS = 1800  # 30 minutes for analysis results
 CACHE_TTL_FEATURES = 600  # 10 minutes for feature extraction
 
 
+def _dumps(value: Any) -> bytes:
+    """Serialize a cache value to bytes (orjson when available)."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(
+            value, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+    return json.dumps(value).encode("utf-8")
+
+
+def _loads(payload: bytes) -> Any:
+    """Deserialize a cache value stored by _dumps."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
+
 def get_redis_client():
     """Get or create Redis client."""
     global _redis_client
@@ -32,7 +62,16 @@ def get_redis_client():
     
     try:
         import redis
-        _redis_client = redis.from_url(REDIS_URL, decode_responses=True)
+        # Explicitly sized, keep-alive connection pool shared by the process.
+        # Raw bytes in and out; (de)serialization happens in _dumps/_loads
+        pool = redis.ConnectionPool.from_url(
+            REDIS_URL,
+            max_connections=REDIS_MAX_CONNECTIONS,
+            socket_keepalive=True,
+            health_check_interval=30,
+            decode_responses=False,
+        )
+        _redis_client = redis.Redis(connection_pool=pool)
         _redis_client.ping()  # Test connection
         logger.info("Redis cache connected", url=REDIS_URL.split("@")[-1])
         return _redis_client
@@ -47,9 +86,12 @@ def cache_key(prefix: str, *args, **kwargs) -> str:
     if kwargs:
         key_data += f":{json.dumps(kwargs, sort_keys=True)}"
     
-    # Hash long keys
+    # Hash long keys (non-cryptographic hash is enough for a cache key)
     if len(key_data) > 200:
-        key_hash = hashlib.sha256(key_data.encode()).hexdigest()[:16]
+        if XXHASH_AVAILABLE:
+            key_hash = xxhash.xxh64(key_data.encode()).hexdigest()
+        else:
+            key_hash = hashlib.sha256(key_data.encode()).hexdigest()[:16]
         return f"{prefix}:{key_hash}"
     
     return key_data
@@ -64,21 +106,54 @@ def get_cached(key: str) -> Optional[Any]:
     try:
         value = redis.get(key)
         if value:
-            return json.loads(value)
+            return _loads(value)
     except Exception as e:
         logger.warning("Cache get failed", key=key, error=str(e))
     
     return None
 
 
-def set_cached(key: str, value: Any, ttl: int = 3600) -> bool:
-    """Set value in cache with TTL."""
+def mget_cached(keys: List[str]) -> List[Optional[Any]]:
+    """
+    Get several values from cache in a single round-trip.
+
+    Uses a non-transactional pipeline so all GETs share one network RTT.
+    Returns a list aligned with ``keys`` (None for misses or errors).
+    """
+    results: List[Optional[Any]] = [None] * len(keys)
+    redis = get_redis_client()
+    if not redis or not keys:
+        return results
+    
+    try:
+        with redis.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.get(key)
+            values = pipe.execute()
+        
+        for i, value in enumerate(values):
+            if value:
+                results[i] = _loads(value)
+    except Exception as e:
+        logger.warning("Cache multi-get failed", count=len(keys), error=str(e))
+    
+    return results
+
+
+def set_cached(key: str, value: Any, ttl: int = 3600, nx: bool = False) -> bool:
+    """
+    Set value in cache with TTL.
+
+    Value and expiry are written by a single SET ... EX command. With
+    ``nx=True`` an existing entry is left untouched (SET ... NX), which suits
+    content-addressed keys where any stored value is already correct.
+    """
     redis = get_redis_client()
     if not redis:
         return False
     
     try:
-        redis.setex(key, ttl, json.dumps(value))
+        redis.set(key, _dumps(value), ex=ttl, nx=nx)
         return True
     except Exception as e:
         logger.warning("Cache set failed", key=key, error=str(e))
@@ -169,26 +244,33 @@ def invalidate_fingerprint(user_id: int) -> bool:
     return delete_cached(key)
 
 
+def _analysis_key(text_hash: str, user_id: int = None) -> str:
+    """Build the cache key for an analysis result."""
+    if user_id:
+        return f"analysis:user:{user_id}:{text_hash}"
+    return f"analysis:{text_hash}"
+
+
 def cache_analysis_result(text_hash: str, result: dict, user_id: int = None) -> bool:
     """Cache analysis result."""
-    key = f"analysis:{text_hash}"
-    if user_id:
-        key = f"analysis:user:{user_id}:{text_hash}"
-    return set_cached(key, result, CACHE_TTL_ANALYSIS)
+    # Keyed by text hash, so an existing entry never needs overwriting
+    return set_cached(_analysis_key(text_hash, user_id), result, CACHE_TTL_ANALYSIS, nx=True)
 
 
 def get_cached_analysis(text_hash: str, user_id: int = None) -> Optional[dict]:
     """Get cached analysis result."""
-    key = f"analysis:{text_hash}"
-    if user_id:
-        key = f"analysis:user:{user_id}:{text_hash}"
-    return get_cached(key)
+    return get_cached(_analysis_key(text_hash, user_id))
+
+
+def get_cached_analyses(text_hashes: List[str], user_id: int = None) -> List[Optional[dict]]:
+    """Get several cached analysis results in one round-trip."""
+    return mget_cached([_analysis_key(h, user_id) for h in text_hashes])
 
 
 def cache_features(text_hash: str, features: dict) -> bool:
     """Cache extracted features."""
     key = f"features:{text_hash}"
-    return set_cached(key, features, CACHE_TTL_FEATURES)
+    return set_cached(key, features, CACHE_TTL_FEATURES, nx=True)
 
 
 def get_cached_features(text_hash: str) -> Optional[dict]:
@@ -5,9 +5,13 @@ For development, emails can be logged or sent via a service like SendGrid.
 """
 import os
 import secrets
+from functools import lru_cache
 from typing import Optional
 from datetime import datetime, timedelta
+from fastapi import BackgroundTasks
 from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from app.models.database import EmailVerificationToken, PasswordResetToken, User
 from dotenv import load_dotenv
 
@@ -22,6 +26,12 @@ SMTP_PASSWORD = os.getenv("SMTP_PASSWORD", "")
 SMTP_FROM = os.getenv("SMTP_FROM", "noreply@ghostwriter.local")
 FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:3000")
 
+# Dialect-specific INSERT constructs supporting ON CONFLICT DO UPDATE
+_UPSERT_INSERTS = {
+    "postgresql": pg_insert,
+    "sqlite": sqlite_insert,
+}
+
 
 def generate_token() -> str:
     """Generate a secure random token"""
@@ -30,20 +40,31 @@ def generate_token() -> str:
 
 def create_email_verification_token(db: Session, user_id: int) -> str:
     """Create and store an email verification token"""
-    # Delete existing token if any
-    db.query(EmailVerificationToken).filter(
-        EmailVerificationToken.user_id == user_id
-    ).delete()
-    
     token = generate_token()
-    expires_at = datetime.utcnow() + timedelta(days=7)
+    now = datetime.utcnow()
+    expires_at = now + timedelta(days=7)
     
-    verification_token = EmailVerificationToken(
-        user_id=user_id,
-        token=token,
-        expires_at=expires_at
-    )
-    db.add(verification_token)
+    dialect = db.get_bind().dialect.name
+    if dialect in _UPSERT_INSERTS:
+        # Replace any existing token for the user in a single statement
+        # (user_id is unique)
+        values = {"token": token, "expires_at": expires_at, "created_at": now}
+        stmt = _UPSERT_INSERTS[dialect](EmailVerificationToken).values(
+            user_id=user_id, **values
+        ).on_conflict_do_update(index_elements=["user_id"], set_=values)
+        db.execute(stmt)
+    else:
+        # Delete existing token if any
+        db.query(EmailVerificationToken).filter(
+            EmailVerificationToken.user_id == user_id
+        ).delete()
+        
+        verification_token = EmailVerificationToken(
+            user_id=user_id,
+            token=token,
+            expires_at=expires_at
+        )
+        db.add(verification_token)
     db.commit()
     
     return token
@@ -70,7 +91,7 @@ def verify_email_token(db: Session, token: str) -> Optional[User]:
     verification = db.query(EmailVerificationToken).filter(
         EmailVerificationToken.token == token,
         EmailVerificationToken.expires_at > datetime.utcnow()
-    ).first()
+    ).one_or_none()
     
     if not verification:
         return None
@@ -93,7 +114,7 @@ def verify_password_reset_token(db: Session, token: str) -> Optional[User]:
         PasswordResetToken.token == token,
         PasswordResetToken.expires_at > datetime.utcnow(),
         PasswordResetToken.used == False
-    ).first()
+    ).one_or_none()
     
     if not reset:
         return None
@@ -105,13 +126,36 @@ def mark_password_reset_token_used(db: Session, token: str):
     """Mark a password reset token as used"""
     reset = db.query(PasswordResetToken).filter(
         PasswordResetToken.token == token
-    ).first()
+    ).one_or_none()
     
     if reset:
         reset.used = True
         db.commit()
 
 
+@lru_cache(maxsize=1)
+def _get_mail_client():
+    """
+    Build the SMTP connection config and FastMail client once per process.
+
+    Returns:
+        (FastMail, MessageSchema) - the shared client and the message class
+    """
+    from fastapi_mail import FastMail, MessageSchema, ConnectionConfig
+
+    conf = ConnectionConfig(
+        MAIL_USERNAME=SMTP_USER,
+        MAIL_PASSWORD=SMTP_PASSWORD,
+        MAIL_FROM=SMTP_FROM,
+        MAIL_PORT=SMTP_PORT,
+        MAIL_SERVER=SMTP_HOST,
+        MAIL_STARTTLS=True,
+        MAIL_SSL_TLS=False,
+        USE_CREDENTIALS=True,
+    )
+    return FastMail(conf), MessageSchema
+
+
 async def send_email(to: str, subject: str, body: str, html_body: Optional[str] = None):
     """
     Send an email. In development, logs to console.
@@ -120,18 +164,7 @@ async def send_email(to: str, subject: str, body: str, html_body: Optional[str]
     if SMTP_ENABLED:
         # Use fastapi-mail or similar
         try:
-            from fastapi_mail import FastMail, MessageSchema, ConnectionConfig
-            
-            conf = ConnectionConfig(
-                MAIL_USERNAME=SMTP_USER,
-                MAIL_PASSWORD=SMTP_PASSWORD,
-                MAIL_FROM=SMTP_FROM,
-                MAIL_PORT=SMTP_PORT,
-                MAIL_SERVER=SMTP_HOST,
-                MAIL_STARTTLS=True,
-                MAIL_SSL_TLS=False,
-                USE_CREDENTIALS=True,
-            )
+            fm, MessageSchema = _get_mail_client()
             
             message = MessageSchema(
                 subject=subject,
@@ -143,7 +176,6 @@ async def send_email(to: str, subject: str, body: str, html_body: Optional[str]
             if html_body:
                 message.body = html_body
             
-            fm = FastMail(conf)
             await fm.send_message(message)
         except Exception as e:
             print(f"Error sending email: {e}")
@@ -161,8 +193,30 @@ async def send_email(to: str, subject: str, body: str, html_body: Optional[str]
         print(f"{'='*60}\n")
 
 
-async def send_verification_email(db: Session, user: User):
-    """Send email verification email"""
+async def _deliver(
+    to: str,
+    subject: str,
+    html_body: str,
+    background_tasks: Optional[BackgroundTasks] = None
+):
+    """Send now, or after the response when background tasks are provided"""
+    if background_tasks is not None:
+        background_tasks.add_task(send_email, to, subject, "", html_body)
+    else:
+        await send_email(to, subject, "", html_body)
+
+
+async def send_verification_email(
+    db: Session,
+    user: User,
+    background_tasks: Optional[BackgroundTasks] = None
+):
+    """
+    Send email verification email.
+
+    The token is stored immediately; with ``background_tasks`` the SMTP send
+    runs after the response has been returned.
+    """
     token = create_email_verification_token(db, user.id)
     verification_url = f"{FRONTEND_URL}/verify-email?token={token}"
     
@@ -181,11 +235,20 @@ async def send_verification_email(db: Session, user: User):
     </html>
     """
     
-    await send_email(user.email, subject, "", html_body)
+    await _deliver(user.email, subject, html_body, background_tasks)
 
 
-async def send_password_reset_email(db: Session, user: User):
-    """Send password reset email"""
+async def send_password_reset_email(
+    db: Session,
+    user: User,
+    background_tasks: Optional[BackgroundTasks] = None
+):
+    """
+    Send password reset email.
+
+    The token is stored immediately; with ``background_tasks`` the SMTP send
+    runs after the response has been returned.
+    """
     token = create_password_reset_token(db, user.id)
     reset_url = f"{FRONTEND_URL}/reset-password?token={token}"
     
@@ -204,4 +267,4 @@ async def send_password_reset_email(db: Session, user: User):
     </html>
     """
     
-    await send_email(user.email, subject, "", html_body)
+    await _deliver(user.email, subject, html_body, background_tasks)
@@ -2,7 +2,7 @@
 File validation utilities to check file types and sizes.
 """
 import os
-from typing import Tuple
+from typing import Optional, Tuple
 from fastapi import UploadFile, HTTPException, status
 
 
@@ -13,6 +13,9 @@ MAX_TEXT_SIZE = 100 * 1024  # 100KB for direct text input
 # Allowed file extensions
 ALLOWED_EXTENSIONS = {'.txt', '.docx', '.pdf'}
 
+# Bytes read from the start of an upload for magic-byte detection
+HEADER_SIZE = 12
+
 # Magic bytes for file type detection
 FILE_SIGNATURES = {
     b'\x50\x4B\x03\x04': '.docx',  # ZIP-based formats (DOCX is a ZIP)
@@ -20,18 +23,40 @@ FILE_SIGNATURES = {
     # TXT doesn't have a magic signature, so we'll check extension
 }
 
+# Signatures bucketed by length (longest first), so detection is one dict
+# lookup per distinct length rather than a startswith() per signature
+_SIGS_BY_LEN = {}
+for _signature, _extension in FILE_SIGNATURES.items():
+    _SIGS_BY_LEN.setdefault(len(_signature), {})[_signature] = _extension
+_SIGS_BY_LEN = dict(sorted(_SIGS_BY_LEN.items(), reverse=True))
+
+# Extensions that must carry a signature
+_SIGNED_EXTENSIONS = frozenset(FILE_SIGNATURES.values())
+
 
-def validate_file_size(file: UploadFile) -> None:
+def validate_file_size(file: UploadFile, content_length: Optional[int] = None) -> None:
     """
     Validate file size.
     
+    Args:
+        file: Upload file
+        content_length: Request Content-Length, if known. It bounds the size
+            of every file in the body, so a small enough request needs no
+            further measuring.
+    
     Raises:
         HTTPException if file is too large
     """
-    # Read file size
-    file.file.seek(0, os.SEEK_END)
-    size = file.file.tell()
-    file.file.seek(0)  # Reset to beginning
+    # Starlette records the size while spooling the upload; only fall back
+    # to seeking to the end when it is unknown
+    size = getattr(file, "size", None)
+    if size is None:
+        if content_length is not None and content_length <= MAX_FILE_SIZE:
+            return
+    
+        file.file.seek(0, os.SEEK_END)
+        size = file.file.tell()
+        file.file.seek(0)  # Reset to beginning
     
     if size > MAX_FILE_SIZE:
         raise HTTPException(
@@ -64,46 +89,99 @@ def validate_file_extension(filename: str) -> str:
     return ext
 
 
-def validate_file_content(file: UploadFile, extension: str) -> None:
+def read_file_header(
+    file: UploadFile,
+    length: int = HEADER_SIZE,
+    buffer: Optional[bytearray] = None
+) -> memoryview:
+    """
+    Read the first bytes of an upload into a reusable buffer and rewind it.
+    
+    Args:
+        file: Upload file
+        length: Number of bytes to read
+        buffer: Preallocated buffer of at least ``length`` bytes; pass the
+            same one when validating many files to avoid per-file allocations
+    
+    Returns:
+        View over up to ``length`` leading bytes of the file (valid until the
+        buffer is reused)
+    """
+    if buffer is None:
+        buffer = bytearray(length)
+    view = memoryview(buffer)[:length]
+    
+    file.file.seek(0)
+    readinto = getattr(file.file, "readinto", None)
+    if readinto is not None:
+        count = readinto(view)
+    else:
+        # SpooledTemporaryFile only gained readinto() in Python 3.11
+        data = file.file.read(length)
+        count = len(data)
+        view[:count] = data
+    file.file.seek(0)  # Reset
+    return view[:count]
+
+
+def detect_file_type(header) -> Optional[str]:
+    """
+    Detect a file's extension from its magic bytes.
+    
+    Args:
+        header: Leading bytes of the file (bytes or memoryview)
+    
+    Returns:
+        Detected extension, or None if no signature matches
+    """
+    for length, signatures in _SIGS_BY_LEN.items():
+        extension = signatures.get(bytes(header[:length]))
+        if extension is not None:
+            return extension
+    return None
+
+
+def validate_file_content(file: UploadFile, extension: str, header=None) -> None:
     """
     Validate file content using magic bytes.
     
     Args:
         file: Upload file
         extension: Expected extension
+        header: Leading bytes already read from the file (read if omitted)
     
     Raises:
         HTTPException if content doesn't match extension
     """
-    # Read first few bytes
-    file.file.seek(0)
-    header = file.file.read(4)
-    file.file.seek(0)  # Reset
+    if header is None:
+        header = read_file_header(file)
+    
+    detected = detect_file_type(header)
     
-    # Check magic bytes
-    if extension == '.pdf':
-        if not header.startswith(b'%PDF'):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="File content does not match PDF format"
-            )
-    elif extension == '.docx':
-        # DOCX files start with PK (ZIP signature)
-        if not header.startswith(b'PK'):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="File content does not match DOCX format"
-            )
-    # TXT files don't have magic bytes, so we skip validation
+    # Content carrying another format's signature is a spoofed extension
+    # (e.g. a PDF renamed to .txt)
+    if detected is not None and detected != extension:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File content does not match {extension.lstrip('.').upper()} format (spoofing detected)"
+        )
+    
+    # TXT files don't have magic bytes, so only signed formats must match
     # In production, you might want to check for valid UTF-8
+    if extension in _SIGNED_EXTENSIONS and detected != extension:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File content does not match {extension.lstrip('.').upper()} format"
+        )
 
 
-def validate_upload_file(file: UploadFile) -> Tuple[str, str]:
+def validate_upload_file(file: UploadFile, content_length: Optional[int] = None) -> Tuple[str, str]:
     """
     Complete file validation: size, extension, and content.
     
     Args:
         file: Upload file
+        content_length: Request Content-Length, if known
     
     Returns:
         Tuple of (filename, extension)
@@ -112,22 +190,30 @@ def validate_upload_file(file: UploadFile) -> Tuple[str, str]:
         HTTPException if validation fails
     """
     # Validate size
-    validate_file_size(file)
+    validate_file_size(file, content_length)
     
     # Validate extension
     extension = validate_file_extension(file.filename)
     
-    # Validate content (magic bytes)
-    try:
-        validate_file_content(file, extension)
-    except Exception as e:
-        # If magic byte validation fails, still allow but log
-        # Some files might be valid but not detected correctly
-        pass
+    # Validate content (magic bytes) from a single header read; files whose
+    # content does not match their extension are rejected
+    validate_file_content(file, extension, read_file_header(file))
     
     return file.filename, extension
 
 
+def utf8_len(text: str) -> int:
+    """
+    Length of text in UTF-8 bytes.
+    
+    ASCII-only strings (checked by a non-allocating C scan) are one byte per
+    character; only other text is actually encoded.
+    """
+    if text.isascii():
+        return len(text)
+    return len(text.encode('utf-8'))
+
+
 def validate_text_length(text: str) -> None:
     """
     Validate text length for direct text input.
@@ -138,7 +224,12 @@ def validate_text_length(text: str) -> None:
     Raises:
         HTTPException if text is too long
     """
-    if len(text.encode('utf-8')) > MAX_TEXT_SIZE:
+    # Each character is 1-4 UTF-8 bytes, so the character count settles
+    # both clearly short and clearly long text without measuring bytes
+    if len(text) * 4 <= MAX_TEXT_SIZE:
+        return
+    
+    if len(text) > MAX_TEXT_SIZE or utf8_len(text) > MAX_TEXT_SIZE:
         raise HTTPException(
             status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
             detail=f"Text exceeds maximum allowed size of {MAX_TEXT_SIZE / 1024:.1f}KB"
@@ -1,58 +1,89 @@
 import re
-import nltk
+from functools import lru_cache
 from typing import List
-import spacy
 
-# Download required NLTK data
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt', quiet=True)
+# Precompiled pattern for whitespace normalization
+_WS_RE = re.compile(r'\s+')
 
-try:
-    nltk.data.find('taggers/averaged_perceptron_tagger')
-except LookupError:
-    nltk.download('averaged_perceptron_tagger', quiet=True)
 
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords', quiet=True)
+# NLTK data paths checked before downloading a resource
+_NLTK_RESOURCE_PATHS = {
+    'punkt': 'tokenizers/punkt',
+    'averaged_perceptron_tagger': 'taggers/averaged_perceptron_tagger',
+}
 
-# Load spaCy model (will need to be downloaded separately)
-try:
-    nlp = spacy.load("en_core_web_sm")
-except OSError:
-    # Fallback if model not available
-    nlp = None
+
+@lru_cache(maxsize=None)
+def ensure_nltk_data(resource: str) -> None:
+    """
+    Download an NLTK resource on first use if it is missing.
+
+    Called lazily by the code that needs the resource, rather than at import
+    time, so workers that never touch NLP skip NLTK entirely.
+    """
+    import nltk
+
+    try:
+        nltk.data.find(_NLTK_RESOURCE_PATHS[resource])
+    except LookupError:
+        nltk.download(resource, quiet=True)
+
+
+@lru_cache(maxsize=1)
+def _get_sentence_tokenizer():
+    """
+    Load the Punkt sentence tokenizer once.
+
+    nltk.sent_tokenize() looks the pickle up through the NLTK data cache on
+    every call; the loaded tokenizer is reused instead. NLTK is imported here
+    so processes that never split sentences don't pay for it at startup.
+    """
+    import nltk
+
+    ensure_nltk_data('punkt')
+    return nltk.data.load('tokenizers/punkt/english.pickle')
+
+
+@lru_cache(maxsize=1)
+def get_nlp():
+    """
+    Load the spaCy English model on first use.
+
+    Returns:
+        spaCy Language object, or None if spaCy or the model is unavailable
+    """
+    try:
+        import spacy
+        # Model will need to be downloaded separately
+        return spacy.load("en_core_web_sm")
+    except (ImportError, OSError):
+        # Fallback if model not available
+        return None
 
 
 def split_into_sentences(text: str) -> List[str]:
     """Split text into sentences"""
-    sentences = nltk.sent_tokenize(text)
+    sentences = _get_sentence_tokenizer().tokenize(text)
     return [s.strip() for s in sentences if s.strip()]
 
 
 def split_into_paragraphs(text: str) -> List[str]:
     """Split text into paragraphs"""
-    paragraphs = [p.strip() for p in text.split('\n\n') if p.strip()]
-    if not paragraphs:
-        # If no double newlines, split by single newlines
-        paragraphs = [p.strip() for p in text.split('\n') if p.strip()]
-    return paragraphs
+    # A C-level substring scan picks the separator, so the text is split once
+    separator = '\n\n' if '\n\n' in text else '\n'
+    return [p.strip() for p in text.split(separator) if p.strip()]
 
 
 def preprocess_text(text: str) -> str:
     """Basic text preprocessing"""
     # Remove extra whitespace
-    text = re.sub(r'\s+', ' ', text)
+    text = _WS_RE.sub(' ', text)
     return text.strip()
 
 
 def get_word_count(text: str) -> int:
     """Count words in text"""
-    words = text.split()
-    return len(words)
+    return len(text.split())
 
 
 def get_character_count(text: str) -> int:
@@ -21,6 +21,7 @@ from pathlib import Path
 import argparse
 import gzip
 import shutil
+import tempfile
 from urllib.parse import urlparse
 from dotenv import load_dotenv
 
@@ -42,7 +43,6 @@ def parse_database_url(url: str) -> dict:
 def create_backup(db_config: dict, backup_dir: Path) -> Path:
     """Create a PostgreSQL backup using pg_dump."""
     timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-    backup_file = backup_dir / f"ghostwriter_backup_{timestamp}.sql"
     compressed_file = backup_dir / f"ghostwriter_backup_{timestamp}.sql.gz"
     
     # Create backup directory if it doesn't exist
@@ -59,27 +59,27 @@ def create_backup(db_config: dict, backup_dir: Path) -> Path:
         "-p", str(db_config["port"]),
         "-U", db_config["user"],
         "-d", db_config["database"],
-        "-F", "p",  # Plain SQL format
-        "-f", str(backup_file),
+        "-F", "p",  # Plain SQL format, written to stdout
         "--no-owner",
         "--no-acl",
     ]
     
-    print(f"Creating backup: {backup_file}")
-    result = subprocess.run(cmd, env=env, capture_output=True, text=True)
-    
-    if result.returncode != 0:
-        print(f"Error creating backup: {result.stderr}")
-        sys.exit(1)
-    
-    # Compress the backup
-    print(f"Compressing backup: {compressed_file}")
-    with open(backup_file, "rb") as f_in:
-        with gzip.open(compressed_file, "wb") as f_out:
-            shutil.copyfileobj(f_in, f_out)
-    
-    # Remove uncompressed file
-    backup_file.unlink()
+    # Stream pg_dump output straight into the gzip file so the uncompressed
+    # dump never touches disk. stderr goes to a temp file so a chatty
+    # pg_dump can't block on a full pipe while we read stdout.
+    print(f"Creating backup: {compressed_file}")
+    with tempfile.TemporaryFile() as stderr_file:
+        proc = subprocess.Popen(cmd, env=env, stdout=subprocess.PIPE, stderr=stderr_file)
+        with gzip.open(compressed_file, "wb", compresslevel=6) as f_out:
+            shutil.copyfileobj(proc.stdout, f_out, length=1 << 20)
+        proc.stdout.close()
+        returncode = proc.wait()
+        
+        if returncode != 0:
+            stderr_file.seek(0)
+            print(f"Error creating backup: {stderr_file.read().decode(errors='replace')}")
+            compressed_file.unlink(missing_ok=True)
+            sys.exit(1)
     
     # Get file size
     size_mb = compressed_file.stat().st_size / (1024 * 1024)
@@ -92,18 +92,32 @@ def upload_to_s3(file_path: Path, bucket: str, prefix: str = "backups"):
     """Upload backup file to S3."""
     try:
         import boto3
+        from boto3.s3.transfer import TransferConfig
+        from botocore.config import Config
         from botocore.exceptions import ClientError
     except ImportError:
         print("Error: boto3 not installed. Run: pip install boto3")
         sys.exit(1)
     
-    s3_client = boto3.client("s3")
+    # Keep-alive connections and adaptive retries, shared by all parts
+    s3_client = boto3.session.Session().client(
+        "s3",
+        config=Config(tcp_keepalive=True, retries={"max_attempts": 10, "mode": "adaptive"}),
+    )
     s3_key = f"{prefix}/{file_path.name}"
     
+    # Large backups go up as a multipart upload with parts sent in parallel
+    transfer_config = TransferConfig(
+        multipart_threshold=8 * 1024 * 1024,
+        multipart_chunksize=16 * 1024 * 1024,
+        max_concurrency=10,
+        use_threads=True,
+    )
+    
     print(f"Uploading to s3://{bucket}/{s3_key}")
     
     try:
-        s3_client.upload_file(str(file_path), bucket, s3_key)
+        s3_client.upload_file(str(file_path), bucket, s3_key, Config=transfer_config)
         print(f"Upload complete: s3://{bucket}/{s3_key}")
     except ClientError as e:
         print(f"Error uploading to S3: {e}")
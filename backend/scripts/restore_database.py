@@ -17,6 +17,7 @@ import sys
 from pathlib import Path
 import argparse
 import gzip
+import shutil
 import tempfile
 from urllib.parse import urlparse
 from dotenv import load_dotenv
@@ -64,36 +65,47 @@ def download_from_s3(s3_path: str, local_path: Path) -> Path:
 
 def restore_backup(backup_file: Path, db_config: dict):
     """Restore a PostgreSQL backup using psql."""
-    # Decompress if needed
-    if str(backup_file).endswith(".gz"):
-        print(f"Decompressing: {backup_file}")
-        decompressed = backup_file.with_suffix("")
-        with gzip.open(backup_file, "rb") as f_in:
-            with open(decompressed, "wb") as f_out:
-                f_out.write(f_in.read())
-        backup_file = decompressed
-    
     # Set password environment variable
     env = os.environ.copy()
     env["PGPASSWORD"] = db_config["password"]
     
-    # Run psql to restore
+    # Run psql to restore, reading the SQL from stdin
     cmd = [
         "psql",
         "-h", db_config["host"],
         "-p", str(db_config["port"]),
         "-U", db_config["user"],
         "-d", db_config["database"],
-        "-f", str(backup_file),
         "-q",  # Quiet mode
     ]
     
-    print(f"Restoring backup to {db_config['database']}...")
-    result = subprocess.run(cmd, env=env, capture_output=True, text=True)
+    # Stream the (decompressed) dump into psql in 1 MiB chunks, so neither a
+    # decompressed copy on disk nor the whole dump in memory is needed
+    opener = gzip.open if str(backup_file).endswith(".gz") else open
     
-    if result.returncode != 0:
-        print(f"Error restoring backup: {result.stderr}")
-        sys.exit(1)
+    print(f"Restoring backup to {db_config['database']}...")
+    with tempfile.TemporaryFile() as stderr_file:
+        proc = subprocess.Popen(
+            cmd, env=env, stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL, stderr=stderr_file
+        )
+        try:
+            with opener(backup_file, "rb") as f_in:
+                shutil.copyfileobj(f_in, proc.stdin, length=1 << 20)
+        except BrokenPipeError:
+            # psql exited early; its error output is reported below
+            pass
+        finally:
+            try:
+                proc.stdin.close()
+            except BrokenPipeError:
+                pass
+        returncode = proc.wait()
+        
+        if returncode != 0:
+            stderr_file.seek(0)
+            print(f"Error restoring backup: {stderr_file.read().decode(errors='replace')}")
+            sys.exit(1)
     
     print("Restore completed successfully!")
 
@@ -3,37 +3,95 @@ Pytest configuration and shared fixtures.
 """
 import pytest
 import os
-from sqlalchemy import create_engine
+from datetime import timedelta
+
+# Minimum bcrypt cost for tests; must be set before app.utils.auth is imported
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 from fastapi.testclient import TestClient
 from app.main import app
 from app.models.database import Base, get_db, User
-from app.utils.auth import get_password_hash
+from app.utils.auth import get_password_hash, create_access_token
 
-# Use in-memory SQLite for testing
-TEST_DATABASE_URL = "sqlite:///./test.db"
+# Use in-memory SQLite for testing; StaticPool shares the single connection
+# (and so the in-memory database) between the engine and every session
+TEST_DATABASE_URL = "sqlite:///:memory:"
 
 engine = create_engine(
     TEST_DATABASE_URL,
-    connect_args={"check_same_thread": False}
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
-@pytest.fixture(scope="function")
-def db():
-    """Create a fresh database for each test."""
+# pysqlite's own transaction handling breaks SAVEPOINTs; let SQLAlchemy
+# emit BEGIN itself so each test can be rolled back as a whole
+@event.listens_for(engine, "connect")
+def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+    dbapi_connection.isolation_level = None
+
+
+@event.listens_for(engine, "begin")
+def _emit_begin(conn):
+    conn.exec_driver_sql("BEGIN")
+
+
+@pytest.fixture(scope="session")
+def db_schema():
+    """Create the schema once for the whole test session."""
     Base.metadata.create_all(bind=engine)
-    db = TestingSessionLocal()
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(scope="function")
+def db(db_schema):
+    """
+    Give each test a session inside a transaction that is rolled back afterwards.
+
+    Commits made by the test (or the app) only release SAVEPOINTs, so every
+    test still starts from an empty database.
+    """
+    connection = engine.connect()
+    transaction = connection.begin()
+    db = TestingSessionLocal(bind=connection, join_transaction_mode="create_savepoint")
     try:
         yield db
     finally:
         db.close()
-        Base.metadata.drop_all(bind=engine)
+        transaction.rollback()
+        connection.close()
+
+
+@pytest.fixture
+def test_db(db):
+    """
+    The per-test rolled-back session under the name the route tests use.
+    
+    It is the same session the client's get_db override hands to the app,
+    so rows a test seeds are visible to its requests.
+    """
+    return db
+
+
+@pytest.fixture(scope="session")
+def app_client():
+    """
+    One TestClient for the whole session.
+
+    Startup handlers run once and the client's connection state is reused,
+    instead of being rebuilt for every test.
+    """
+    with TestClient(app) as test_client:
+        yield test_client
 
 
 @pytest.fixture
-def client(db):
+def client(app_client, db):
     """Create a test client with database override."""
     def override_get_db():
         try:
@@ -41,19 +99,38 @@ def client(db):
         finally:
             pass
     
-    from app.models.database import get_db
     app.dependency_overrides[get_db] = override_get_db
-    with TestClient(app) as test_client:
-        yield test_client
-    app.dependency_overrides.clear()
+    try:
+        yield app_client
+    finally:
+        app.dependency_overrides.clear()
+        # Nothing a test sets on the shared client may leak into the next one
+        app_client.cookies.clear()
+        app_client.headers.pop("Authorization", None)
+
+
+TEST_USER_EMAIL = "test@example.com"
+TEST_USER_PASSWORD = "testpassword123"
+
+
+@pytest.fixture(scope="session")
+def test_password_hash():
+    """Hash the test password once; bcrypt is deliberately slow."""
+    return get_password_hash(TEST_USER_PASSWORD)
+
+
+@pytest.fixture(scope="session")
+def test_access_token():
+    """Access token for the test user, issued once per session."""
+    return create_access_token(data={"sub": TEST_USER_EMAIL}, expires_delta=timedelta(hours=12))
 
 
 @pytest.fixture
-def test_user(db):
+def test_user(db, test_password_hash):
     """Create a test user."""
     user = User(
-        email="test@example.com",
-        password_hash=get_password_hash("testpassword123")
+        email=TEST_USER_EMAIL,
+        password_hash=test_password_hash
     )
     db.add(user)
     db.commit()
@@ -62,18 +139,9 @@ def test_user(db):
 
 
 @pytest.fixture
-def auth_headers(client, test_user):
+def auth_headers(client, test_user, test_access_token):
     """Get authentication headers for a test user."""
-    response = client.post(
-        "/api/auth/login-json",
-        json={
-            "email": test_user.email,
-            "password": "testpassword123"
-        }
-    )
-    assert response.status_code == 200
-    token = response.json()["access_token"]
-    return {"Authorization": f"Bearer {token}"}
+    return {"Authorization": f"Bearer {test_access_token}"}
 
 
 @pytest.fixture
@@ -6,14 +6,40 @@ Run with:
 
 Or headless:
     locust -f locustfile.py --host=http://localhost:8000 --headless -u 100 -r 10 -t 60s
+
+Users are FastHttpUser (geventhttpclient) rather than HttpUser (requests),
+which sustains several times more requests per second per generator core.
+It also keeps many more sockets open at once, so raise the open-file limit
+first on large runs:
+    ulimit -n 65535
+
+Distributed mode (one worker process per CPU core, ~500-1000 users each):
+    locust -f locustfile.py --host=http://localhost:8000 --master
+    locust -f locustfile.py --worker --master-host=127.0.0.1   # run N times
+
+    # Makefile-style target:
+    # loadtest-distributed:
+    #     locust -f locustfile.py --master --expect-workers=$(WORKERS) &
+    #     for i in $$(seq $(WORKERS)); do locust -f locustfile.py --worker & done
 """
-from locust import HttpUser, task, between, events
+from locust import FastHttpUser, LoadTestShape, task, between, events
+from locust.runners import MasterRunner
+import gevent
+import itertools
+import logging
+import os
 import random
 import json
+import socket
+import uuid
+import requests
+
 
+# Stress runs validate status codes only and never parse response bodies
+STRESS_MODE = os.getenv("LOCUST_STRESS_MODE") == "1"
 
-# Sample texts for analysis
-SAMPLE_TEXTS = [
+# Sample texts for analysis, as written
+SAMPLE_TEXTS_RAW = (
     """
     Artificial intelligence is transforming the world as we know it.
     Machine learning algorithms are becoming increasingly sophisticated.
@@ -34,31 +60,57 @@ SAMPLE_TEXTS = [
     Revenue increased by 15% compared to the same period last year.
     We expect continued momentum in the coming quarters.
     """,
-]
+)
 
+# Whitespace collapsed once at import so requests carry no indentation
+# (a tuple: one immutable copy shared by all users)
+SAMPLE_TEXTS = tuple(" ".join(text.split()) for text in SAMPLE_TEXTS_RAW)
 
-class GhostwriterUser(HttpUser):
+# Accounts registered once at test start, so users only log in during ramp
+USER_POOL_SIZE = int(os.getenv("LOCUST_USER_POOL_SIZE", "100"))
+POOL_USER_PASSWORD = "LoadTest123!"
+PRE_REGISTERED_USERS = []
+
+# Request bodies serialized once at import; tasks send the bytes as-is
+SAMPLE_PAYLOADS = tuple(
+    json.dumps({"text": text, "granularity": "sentence"}).encode()
+    for text in SAMPLE_TEXTS
+)
+RAPID_PAYLOAD = json.dumps({
+    "text": "Quick test text for load testing purposes.",
+    "granularity": "sentence"
+}).encode()
+
+
+class GhostwriterUser(FastHttpUser):
     """Simulates a typical user of the Ghostwriter application."""
     
     wait_time = between(1, 5)
+    network_timeout = 30.0
+    connection_timeout = 10.0
     token = None
     user_email = None
     
     def on_start(self):
         """Called when a user starts - handles registration and login."""
-        # Generate unique user for this locust user
-        import uuid
-        self.user_email = f"loadtest_{uuid.uuid4().hex[:8]}@test.com"
-        self.user_password = "LoadTest123!"
-        
-        # Try to register (might already exist)
-        self.client.post(
-            "/api/auth/register",
-            data={
-                "username": self.user_email,
-                "password": self.user_password,
-            }
-        )
+        if PRE_REGISTERED_USERS:
+            # Take an account registered at test start; list.pop() never
+            # yields to another greenlet, so no lock is needed
+            self.user_email = PRE_REGISTERED_USERS.pop()
+            self.user_password = POOL_USER_PASSWORD
+        else:
+            # Pool exhausted: generate unique user for this locust user
+            self.user_email = f"loadtest_{uuid.uuid4().hex[:8]}@test.com"
+            self.user_password = "LoadTest123!"
+            
+            # Try to register (might already exist)
+            self.client.post(
+                "/api/auth/register",
+                data={
+                    "username": self.user_email,
+                    "password": self.user_password,
+                }
+            )
         
         # Login
         response = self.client.post(
@@ -82,35 +134,28 @@ class GhostwriterUser(HttpUser):
             )
             if response.status_code == 200:
                 self.token = response.json().get("access_token")
+        
+        # Headers built once per user instead of on every task
+        self.auth_headers = {"Authorization": f"Bearer {self.token}"} if self.token else {}
+        self._post_headers = {**self.auth_headers, "Content-Type": "application/json"}
+        
+        # Cycle through the payloads from a random starting point, so users
+        # don't move in lockstep and no task pays for a random draw
+        self._payloads = itertools.cycle(SAMPLE_PAYLOADS)
+        offset = random.randrange(len(SAMPLE_PAYLOADS))
+        next(itertools.islice(self._payloads, offset, offset), None)
     
-    @property
-    def auth_headers(self):
-        """Get authorization headers."""
-        if self.token:
-            return {"Authorization": f"Bearer {self.token}"}
-        return {}
-    
-    @task(3)
-    def health_check(self):
-        """Check API health - high frequency task."""
-        self.client.get("/health")
-    
-    @task(2)
+    @task(5)
     def analyze_text(self):
         """Analyze text - main user action."""
-        text = random.choice(SAMPLE_TEXTS)
-        
         response = self.client.post(
             "/api/analysis/",
-            json={
-                "text": text,
-                "granularity": "sentence"
-            },
-            headers=self.auth_headers,
+            data=next(self._payloads),
+            headers=self._post_headers,
             name="/api/analysis/"
         )
         
-        if response.status_code == 200:
+        if response.status_code == 200 and not STRESS_MODE:
             data = response.json()
             # Validate response structure
             assert "overall_ai_probability" in data
@@ -135,64 +180,150 @@ class GhostwriterUser(HttpUser):
         )
 
 
-class HighLoadUser(HttpUser):
+class HighLoadUser(FastHttpUser):
     """Simulates high-frequency API usage for stress testing."""
     
     wait_time = between(0.1, 0.5)
+    network_timeout = 30.0
+    connection_timeout = 10.0
     token = None
     
     def on_start(self):
         """Quick login for high-load testing."""
-        import uuid
-        email = f"stress_{uuid.uuid4().hex[:8]}@test.com"
-        
-        # Register
-        self.client.post(
-            "/api/auth/register",
-            data={"username": email, "password": "StressTest123!"}
-        )
+        if PRE_REGISTERED_USERS:
+            email = PRE_REGISTERED_USERS.pop()
+            password = POOL_USER_PASSWORD
+        else:
+            email = f"stress_{uuid.uuid4().hex[:8]}@test.com"
+            password = "StressTest123!"
+            
+            # Register
+            self.client.post(
+                "/api/auth/register",
+                data={"username": email, "password": password}
+            )
         
         # Login
         response = self.client.post(
             "/api/auth/login-json",
-            json={"email": email, "password": "StressTest123!"}
+            json={"email": email, "password": password}
         )
         
         if response.status_code == 200:
             self.token = response.json().get("access_token")
+        
+        # Headers built once per user instead of on every task
+        self.auth_headers = {"Authorization": f"Bearer {self.token}"} if self.token else {}
+        self._post_headers = {**self.auth_headers, "Content-Type": "application/json"}
     
-    @property
-    def auth_headers(self):
-        if self.token:
-            return {"Authorization": f"Bearer {self.token}"}
-        return {}
-    
-    @task(5)
-    def rapid_health_check(self):
-        """Rapid health checks to test throughput."""
-        self.client.get("/health")
-    
-    @task(2)
+    @task
     def rapid_analysis(self):
         """Rapid text analysis."""
-        self.client.post(
+        # Status-only validation; the body is never read
+        with self.client.post(
             "/api/analysis/",
-            json={
-                "text": "Quick test text for load testing purposes.",
-                "granularity": "sentence"
-            },
-            headers=self.auth_headers,
-            name="/api/analysis/ (rapid)"
+            data=RAPID_PAYLOAD,
+            headers=self._post_headers,
+            name="/api/analysis/ (rapid)",
+            catch_response=True
+        ) as response:
+            if response.status_code == 200:
+                response.success()
+            else:
+                response.failure(f"HTTP {response.status_code}")
+
+
+class HealthProbeUser(FastHttpUser):
+    """
+    Polls /health at an infrastructure-monitor cadence.
+    
+    Kept out of the user classes so probe traffic doesn't take generator
+    capacity away from the endpoints under test. Exactly one instance is
+    spawned regardless of the total user count.
+    """
+    
+    fixed_count = 1
+    wait_time = between(5, 10)
+    network_timeout = 30.0
+    connection_timeout = 10.0
+    
+    @task
+    def health_check(self):
+        """Check API health."""
+        self.client.get("/health")
+
+
+# Locust uses any LoadTestShape defined here in place of -u/-r, so the
+# gradual ramp is opt-in to keep the plain invocations above working
+if os.getenv("LOCUST_GRADUAL_SHAPE") == "1":
+    class GradualLoadShape(LoadTestShape):
+        """
+        Ramp users up in stages so registration/login and connection setup
+        don't all hit the server in the same second.
+        """
+        
+        # (end time in seconds, users, spawn rate)
+        stages = (
+            (60, 500, 50),
+            (120, 1500, 100),
+            (180, 3000, 100),
+            (300, 3000, 100),
         )
+        
+        def tick(self):
+            run_time = self.get_run_time()
+            for end_time, users, spawn_rate in self.stages:
+                if run_time < end_time:
+                    return users, spawn_rate
+            return None
 
 
 # Event handlers for reporting
+@events.init.add_listener
+def on_locust_init(environment, **kwargs):
+    """
+    Quiet Locust's own logging so log I/O doesn't throttle busy workers, and
+    pick an asynchronous DNS resolver before the first lookup.
+    
+    The resolver is chosen here rather than in on_test_start because the
+    account-pool registration at test start already resolves the host. This
+    relies on Locust having monkey-patched all socket I/O.
+    """
+    logging.getLogger("locust").setLevel(logging.WARNING)
+    
+    # First importable wins: c-ares, then dnspython, then gevent's threadpool
+    try:
+        gevent.config.resolver = ["ares", "dnspython", "thread"]
+    except ImportError:
+        pass
+    # Bound any lookup or connect that still blocks
+    socket.setdefaulttimeout(30)
+
+
 @events.request.add_listener
 def on_request(request_type, name, response_time, response_length, **kwargs):
     """Log request metrics."""
     pass  # Can add custom logging here
 
 
+@events.test_start.add_listener
+def register_user_pool(environment, **kwargs):
+    """Register the shared account pool sequentially before users spawn."""
+    if isinstance(environment.runner, MasterRunner) or not environment.host:
+        return
+    
+    with requests.Session() as session:
+        for _ in range(USER_POOL_SIZE):
+            email = f"loadtest_{uuid.uuid4().hex[:8]}@test.com"
+            response = session.post(
+                f"{environment.host}/api/auth/register",
+                json={"email": email, "password": POOL_USER_PASSWORD},
+                timeout=30
+            )
+            if response.status_code in (200, 201):
+                PRE_REGISTERED_USERS.append(email)
+
+
 @events.test_start.add_listener
 def on_test_start(environment, **kwargs):
     """Called when test starts."""
@@ -1,6 +1,7 @@
 """Tests for account management routes (GDPR compliance)."""
 import pytest
 from unittest.mock import patch, MagicMock
+from sqlalchemy import exists
 
 
 class TestAccountRoutes:
@@ -70,10 +71,9 @@ class TestAccountRoutes:
         assert response.status_code == 200
         
         # Verify deletion
-        count = test_db.query(WritingSample).filter(
-            WritingSample.user_id == sample_user.id
-        ).count()
-        assert count == 0
+        assert not test_db.query(
+            exists().where(WritingSample.user_id == sample_user.id)
+        ).scalar()
     
     def test_delete_specific_data_analyses(self, client, auth_headers, sample_user, test_db):
         """Test deleting analysis results."""
@@ -129,8 +129,7 @@ class TestAccountRoutes:
         assert response.status_code == 200
         
         # User should be deleted
-        user = test_db.query(User).filter(User.id == user_id).first()
-        assert user is None
+        assert not test_db.query(exists().where(User.id == user_id)).scalar()
     
     def test_delete_account_wrong_password(self, client, auth_headers):
         """Test account deletion with wrong password."""
@@ -1,7 +1,30 @@
 """Tests for admin routes."""
 import pytest
+from functools import lru_cache
+from datetime import timedelta
 from app.models.database import User
-from app.utils.auth import get_password_hash
+from app.utils.auth import get_password_hash, create_access_token
+
+
+ADMIN_EMAIL = "admin@test.com"
+ADMIN_PASSWORD = "adminpassword123"
+
+
+@lru_cache(maxsize=None)
+def _hashed(password: str) -> str:
+    """Hash each seeded password once; bcrypt is deliberately slow."""
+    return get_password_hash(password)
+
+
+@pytest.fixture(scope="session")
+def admin_token():
+    """
+    Access token for the admin user, issued once per session.
+    
+    The token only names the admin's email, so it stays valid for the
+    admin row each test recreates.
+    """
+    return create_access_token(data={"sub": ADMIN_EMAIL}, expires_delta=timedelta(hours=12))
 
 
 class TestAdminRoutes:
@@ -11,8 +34,8 @@ class TestAdminRoutes:
     def admin_user(self, test_db):
         """Create an admin user."""
         admin = User(
-            email="admin@test.com",
-            password_hash=get_password_hash("adminpassword123"),
+            email=ADMIN_EMAIL,
+            password_hash=_hashed(ADMIN_PASSWORD),
             email_verified=True,
             is_active=True,
             is_admin=True
@@ -23,14 +46,9 @@ class TestAdminRoutes:
         return admin
     
     @pytest.fixture
-    def admin_headers(self, client, admin_user):
+    def admin_headers(self, client, admin_user, admin_token):
         """Get auth headers for admin user."""
-        response = client.post(
-            "/api/auth/login-json",
-            json={"email": "admin@test.com", "password": "adminpassword123"}
-        )
-        token = response.json()["access_token"]
-        return {"Authorization": f"Bearer {token}"}
+        return {"Authorization": f"Bearer {admin_token}"}
     
     def test_get_stats_as_admin(self, client, admin_headers):
         """Test getting system stats as admin."""
@@ -105,7 +123,7 @@ class TestAdminRoutes:
         """Test activating a user."""
         # First deactivate
         sample_user.is_active = False
-        test_db.commit()
+        test_db.flush()  # request shares this session; no commit needed
         
         response = client.post(
             f"/api/admin/users/{sample_user.id}/activate",
@@ -123,7 +141,7 @@ class TestAdminRoutes:
         # Lock the user
         sample_user.failed_login_attempts = 5
         sample_user.locked_until = datetime.utcnow() + timedelta(hours=1)
-        test_db.commit()
+        test_db.flush()  # request shares this session; no commit needed
         
         response = client.post(
             f"/api/admin/users/{sample_user.id}/unlock",
@@ -138,7 +156,7 @@ class TestAdminRoutes:
     def test_verify_user_email(self, client, admin_headers, sample_user, test_db):
         """Test manually verifying user email."""
         sample_user.email_verified = False
-        test_db.commit()
+        test_db.flush()  # request shares this session; no commit needed
         
         response = client.post(
             f"/api/admin/users/{sample_user.id}/verify-email",
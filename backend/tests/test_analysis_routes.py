@@ -4,39 +4,51 @@ Tests for analysis routes.
 import pytest
 from fastapi import status
 
+# Error-path request bodies, encoded once instead of serialized per request
+_BAD_GRANULARITY_BODY = b'{"text":"Sample text","granularity":"invalid"}'
+_EMPTY_TEXT_BODY = b'{"text":"","granularity":"sentence"}'
 
-def test_analyze_text_success(client, auth_headers):
-    """Test successful text analysis."""
-    response = client.post(
-        "/api/analysis/analyze",
-        headers=auth_headers,
-        json={
-            "text": "This is a sample text for analysis. It contains multiple sentences.",
-            "granularity": "sentence"
-        }
+
+def _create_fingerprint(db, user):
+    """Upload a writing sample and build the user's fingerprint."""
+    from app.services.fingerprint_service import get_fingerprint_service
+    
+    fingerprint_service = get_fingerprint_service()
+    fingerprint_service.upload_writing_sample(
+        db=db,
+        user_id=user.id,
+        text_content="This is my writing sample. It demonstrates my style.",
+        source_type="manual"
     )
-    assert response.status_code == status.HTTP_200_OK
-    data = response.json()
-    assert "heat_map_data" in data
-    assert "segments" in data["heat_map_data"]
-    assert "overall_ai_probability" in data["heat_map_data"]
-    assert "analysis_id" in data
-    assert "created_at" in data
-    assert len(data["heat_map_data"]["segments"]) > 0
+    fingerprint_service.generate_user_fingerprint(db, user.id)
 
 
-def test_analyze_text_paragraph_granularity(client, auth_headers):
-    """Test text analysis with paragraph granularity."""
+@pytest.mark.parametrize("text,granularity,with_fingerprint", [
+    # Successful sentence-level analysis
+    ("This is a sample text for analysis. It contains multiple sentences.", "sentence", False),
+    # Paragraph granularity
+    ("First paragraph.\n\nSecond paragraph.\n\nThird paragraph.", "paragraph", False),
+    # Analysis using the user's fingerprint
+    ("This is a sample text for analysis.", "sentence", True),
+])
+def test_analyze_text_success(client, auth_headers, request, text, granularity, with_fingerprint):
+    """Test successful text analysis across granularities and with a fingerprint."""
+    if with_fingerprint:
+        # Only this case writes samples/fingerprints to the database
+        _create_fingerprint(request.getfixturevalue("db"), request.getfixturevalue("test_user"))
+    
     response = client.post(
         "/api/analysis/analyze",
         headers=auth_headers,
         json={
-            "text": "First paragraph.\n\nSecond paragraph.\n\nThird paragraph.",
-            "granularity": "paragraph"
+            "text": text,
+            "granularity": granularity
         }
     )
     assert response.status_code == status.HTTP_200_OK
     data = response.json()
+    assert {"analysis_id", "created_at", "heat_map_data"} <= data.keys()
+    assert {"segments", "overall_ai_probability"} <= data["heat_map_data"].keys()
     assert len(data["heat_map_data"]["segments"]) >= 1
 
 
@@ -44,11 +56,8 @@ def test_analyze_text_invalid_granularity(client, auth_headers):
     """Test text analysis with invalid granularity."""
     response = client.post(
         "/api/analysis/analyze",
-        headers=auth_headers,
-        json={
-            "text": "Sample text",
-            "granularity": "invalid"
-        }
+        headers={**auth_headers, "Content-Type": "application/json"},
+        content=_BAD_GRANULARITY_BODY
     )
     assert response.status_code == status.HTTP_400_BAD_REQUEST
 
@@ -57,11 +66,8 @@ def test_analyze_text_empty(client, auth_headers):
     """Test text analysis with empty text."""
     response = client.post(
         "/api/analysis/analyze",
-        headers=auth_headers,
-        json={
-            "text": "",
-            "granularity": "sentence"
-        }
+        headers={**auth_headers, "Content-Type": "application/json"},
+        content=_EMPTY_TEXT_BODY
     )
     assert response.status_code == status.HTTP_400_BAD_REQUEST
 
@@ -76,32 +82,3 @@ def test_analyze_text_unauthorized(client):
         }
     )
     assert response.status_code == status.HTTP_401_UNAUTHORIZED
-
-
-def test_analyze_text_with_fingerprint(client, auth_headers, db, test_user):
-    """Test text analysis with user fingerprint."""
-    from app.services.fingerprint_service import get_fingerprint_service
-    from app.models.database import WritingSample
-    
-    # Create writing samples and fingerprint
-    fingerprint_service = get_fingerprint_service()
-    sample = fingerprint_service.upload_writing_sample(
-        db=db,
-        user_id=test_user.id,
-        text_content="This is my writing sample. It demonstrates my style.",
-        source_type="manual"
-    )
-    fingerprint_service.generate_user_fingerprint(db, test_user.id)
-    
-    # Analyze text (should use fingerprint)
-    response = client.post(
-        "/api/analysis/analyze",
-        headers=auth_headers,
-        json={
-            "text": "This is a sample text for analysis.",
-            "granularity": "sentence"
-        }
-    )
-    assert response.status_code == status.HTTP_200_OK
-    data = response.json()
-    assert "heat_map_data" in data
\ No newline at end of file
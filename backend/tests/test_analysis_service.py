@@ -5,10 +5,19 @@ import pytest
 import numpy as np
 from app.services.analysis_service import AnalysisService, get_analysis_service
 
+# Minimal 13-feature vector: burstiness, perplexity, rare/unique word ratios
+BASE_FEATURES = np.zeros(13)
+BASE_FEATURES[:4] = (0.5, 50.0, 0.1, 0.2)
 
-def test_analyze_text_sentence_granularity():
+
+@pytest.fixture(scope="module")
+def service():
+    """One AnalysisService shared by the tests in this module."""
+    return AnalysisService()
+
+
+def test_analyze_text_sentence_granularity(service):
     """Test analyzing text with sentence granularity."""
-    service = AnalysisService()
     text = "First sentence. Second sentence. Third sentence."
     result = service.analyze_text(text, granularity="sentence")
     
@@ -20,9 +29,8 @@ def test_analyze_text_sentence_granularity():
     assert all(0 <= seg["ai_probability"] <= 1 for seg in result["segments"])
 
 
-def test_analyze_text_paragraph_granularity():
+def test_analyze_text_paragraph_granularity(service):
     """Test analyzing text with paragraph granularity."""
-    service = AnalysisService()
     text = "First paragraph.\n\nSecond paragraph.\n\nThird paragraph."
     result = service.analyze_text(text, granularity="paragraph")
     
@@ -30,23 +38,20 @@ def test_analyze_text_paragraph_granularity():
     assert len(result["segments"]) > 0
 
 
-def test_analyze_text_invalid_granularity():
+def test_analyze_text_invalid_granularity(service):
     """Test analyzing text with invalid granularity."""
-    service = AnalysisService()
     with pytest.raises(ValueError, match="Invalid granularity"):
         service.analyze_text("Text", granularity="invalid")
 
 
-def test_analyze_text_empty():
+def test_analyze_text_empty(service):
     """Test analyzing empty text."""
-    service = AnalysisService()
     with pytest.raises(ValueError, match="cannot be empty"):
         service.analyze_text("")
 
 
-def test_analyze_text_with_fingerprint():
+def test_analyze_text_with_fingerprint(service):
     """Test analyzing text with user fingerprint."""
-    service = AnalysisService()
     text = "Sample text for analysis."
     fingerprint = {
         "feature_vector": [0.5] * 13,
@@ -58,9 +63,8 @@ def test_analyze_text_with_fingerprint():
     assert "overall_ai_probability" in result
 
 
-def test_analyze_with_fingerprint_method():
+def test_analyze_with_fingerprint_method(service):
     """Test analyze_with_fingerprint method."""
-    service = AnalysisService()
     text = "Sample text."
     fingerprint = {
         "feature_vector": [0.5] * 13,
@@ -71,18 +75,16 @@ def test_analyze_with_fingerprint_method():
     assert "segments" in result
 
 
-def test_estimate_ai_probability():
+def test_estimate_ai_probability(service):
     """Test AI probability estimation."""
-    service = AnalysisService()
-    features = np.array([0.5, 50.0, 0.1, 0.2] + [0.0] * 9)  # Minimal feature vector
+    features = BASE_FEATURES.copy()
     prob = service._estimate_ai_probability(features)
     
     assert 0 <= prob <= 1
 
 
-def test_estimate_ai_probability_short_vector():
+def test_estimate_ai_probability_short_vector(service):
     """Test AI probability estimation with short feature vector."""
-    service = AnalysisService()
     features = np.array([0.5])
     prob = service._estimate_ai_probability(features)
     
@@ -97,9 +99,8 @@ def test_get_analysis_service():
     assert service1 is service2
 
 
-def test_analyze_text_whitespace_handling():
+def test_analyze_text_whitespace_handling(service):
     """Test that whitespace-only segments are skipped."""
-    service = AnalysisService()
     text = "First sentence.   \n\n   Second sentence."
     result = service.analyze_text(text, granularity="sentence")
     
@@ -2,8 +2,9 @@
 Tests for authentication routes.
 """
 import pytest
-from fastapi import status
-from app.models.database import User
+from unittest.mock import AsyncMock, patch
+from fastapi import BackgroundTasks, status
+from app.models.database import EmailVerificationToken, User
 
 
 def test_register_success(client, db):
@@ -123,4 +124,74 @@ def test_login_form_data_wrong_password(client, test_user):
             "password": "wrongpassword"
         }
     )
-    assert response.status_code == status.HTTP_401_UNAUTHORIZED
\ No newline at end of file
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def _verification_tokens(db, user_id):
+    """Fresh read of a user's verification tokens (the upsert bypasses the ORM)."""
+    db.expire_all()
+    return db.query(EmailVerificationToken).filter(
+        EmailVerificationToken.user_id == user_id
+    ).all()
+
+
+def test_register_creates_verification_token(client, db):
+    """Registration inserts a single verification token for the new user."""
+    with patch("app.utils.email.send_email", new_callable=AsyncMock):
+        response = client.post(
+            "/api/auth/register",
+            json={"email": "verifyme@example.com", "password": "password123"}
+        )
+    assert response.status_code == status.HTTP_201_CREATED
+    
+    tokens = _verification_tokens(db, response.json()["id"])
+    assert len(tokens) == 1
+
+
+def test_resend_verification_replaces_token(client, db, test_user, auth_headers):
+    """Resending updates the user's existing token row instead of adding one."""
+    with patch("app.utils.email.send_email", new_callable=AsyncMock):
+        first = client.post("/api/auth/resend-verification", headers=auth_headers)
+        assert first.status_code == status.HTTP_200_OK
+        first_tokens = _verification_tokens(db, test_user.id)
+        
+        second = client.post("/api/auth/resend-verification", headers=auth_headers)
+        assert second.status_code == status.HTTP_200_OK
+        second_tokens = _verification_tokens(db, test_user.id)
+    
+    assert len(first_tokens) == 1
+    assert len(second_tokens) == 1
+    assert second_tokens[0].token != first_tokens[0].token
+
+
+@pytest.mark.parametrize("endpoint", ["register", "resend-verification"])
+def test_verification_email_sent_in_background(client, test_user, auth_headers, endpoint):
+    """The verification email is queued on BackgroundTasks, not awaited in the handler."""
+    send_mock = AsyncMock()
+    queued = []
+    original_add_task = BackgroundTasks.add_task
+    
+    def spy_add_task(self, func, *args, **kwargs):
+        # Nothing may have been sent by the time the task is queued
+        queued.append((func, args, send_mock.await_count))
+        return original_add_task(self, func, *args, **kwargs)
+    
+    if endpoint == "register":
+        request = {"json": {"email": "queued@example.com", "password": "password123"}}
+        recipient = "queued@example.com"
+    else:
+        request = {"headers": auth_headers}
+        recipient = test_user.email
+    
+    with patch("app.utils.email.send_email", send_mock), \
+            patch.object(BackgroundTasks, "add_task", spy_add_task):
+        response = client.post(f"/api/auth/{endpoint}", **request)
+    
+    assert response.status_code in (status.HTTP_200_OK, status.HTTP_201_CREATED)
+    email_tasks = [(args, sent) for func, args, sent in queued if func is send_mock]
+    assert len(email_tasks) == 1
+    args, sent_before_queueing = email_tasks[0]
+    assert args[0] == recipient
+    assert sent_before_queueing == 0
+    # TestClient runs background tasks once the response has been produced
+    send_mock.assert_awaited_once()
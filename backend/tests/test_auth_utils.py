@@ -10,10 +10,28 @@ from app.utils.auth import (
     ACCESS_TOKEN_EXPIRE_MINUTES
 )
 from datetime import timedelta
-from jose import jwt, JWTError
+import jwt
 import os
 
 
+# The plaintext behind conftest's session-scoped test_password_hash
+TEST_USER_PASSWORD = "testpassword123"
+LONG_PASSWORD = "a" * 100
+
+
+@pytest.fixture(scope="session")
+def long_password_hash():
+    """Hash the >72-byte test password once per session."""
+    return get_password_hash(LONG_PASSWORD)
+
+
+@pytest.fixture(scope="session")
+def expired_token():
+    """Access token that expired an hour ago, signed once per session."""
+    # Negative delta = expired
+    return create_access_token({"sub": "user@example.com"}, expires_delta=timedelta(minutes=-60))
+
+
 def test_get_password_hash():
     """Test password hashing."""
     password = "testpassword123"
@@ -24,37 +42,58 @@ def test_get_password_hash():
     assert isinstance(hashed, str)
 
 
-def test_verify_password_correct():
+def test_verify_password_correct(test_password_hash):
     """Test password verification with correct password."""
-    password = "testpassword123"
-    hashed = get_password_hash(password)
-    
-    assert verify_password(password, hashed) == True
+    assert verify_password(TEST_USER_PASSWORD, test_password_hash) == True
 
 
-def test_verify_password_incorrect():
+def test_verify_password_incorrect(test_password_hash):
     """Test password verification with incorrect password."""
-    password = "testpassword123"
-    hashed = get_password_hash(password)
-    
-    assert verify_password("wrongpassword", hashed) == False
+    assert verify_password("wrongpassword", test_password_hash) == False
 
 
-def test_verify_password_empty():
+def test_verify_password_empty(test_password_hash):
     """Test password verification with empty password."""
-    password = "testpassword123"
-    hashed = get_password_hash(password)
-    
-    assert verify_password("", hashed) == False
+    assert verify_password("", test_password_hash) == False
 
 
-def test_verify_password_long_password():
+def test_verify_password_long_password(long_password_hash):
     """Test password hashing with long password (>72 bytes)."""
+    assert verify_password(LONG_PASSWORD, long_password_hash) == True
+    assert verify_password("wrong", long_password_hash) == False
+
+
+def test_verify_password_uses_cache(test_password_hash):
+    """Repeated verification of the same pair skips bcrypt until cleared."""
+    from unittest.mock import patch
+    from app.utils.auth import clear_password_verification_cache
+    
+    password = TEST_USER_PASSWORD
+    hashed = test_password_hash
+    clear_password_verification_cache()
+    
+    with patch("app.utils.auth.bcrypt.checkpw", return_value=True) as mock_checkpw:
+        assert verify_password(password, hashed) == True
+        assert verify_password(password, hashed) == True
+        assert mock_checkpw.call_count == 1
+        
+        clear_password_verification_cache()
+        assert verify_password(password, hashed) == True
+        assert mock_checkpw.call_count == 2
+    
+    clear_password_verification_cache()
+
+
+def test_prepare_password_long_uses_raw_digest():
+    """Long passwords are pre-hashed to the raw 32-byte SHA-256 digest."""
+    import hashlib
+    from app.utils.auth import _prepare_password_for_bcrypt
+    
     long_password = "a" * 100
-    hashed = get_password_hash(long_password)
+    prepared = _prepare_password_for_bcrypt(long_password)
     
-    assert verify_password(long_password, hashed) == True
-    assert verify_password("wrong", hashed) == False
+    assert prepared == hashlib.sha256(long_password.encode("utf-8")).digest()
+    assert len(prepared) == 32
 
 
 def test_create_access_token():
@@ -80,10 +119,9 @@ def test_create_access_token_with_expiry():
     assert "exp" in decoded
 
 
-def test_get_current_user_valid_token(client, test_user, db):
+def test_get_current_user_valid_token(client, test_user, db, test_access_token):
     """Test getting current user with valid token."""
-    token = create_access_token({"sub": test_user.email})
-    user = get_current_user(token=token, db=db)
+    user = get_current_user(token=test_access_token, db=db)
     
     assert user is not None
     assert user.id == test_user.id
@@ -96,15 +134,10 @@ def test_get_current_user_invalid_token(db):
         get_current_user(token="invalid_token", db=db)
 
 
-def test_get_current_user_expired_token(db):
+def test_get_current_user_expired_token(db, expired_token):
     """Test getting current user with expired token."""
-    # Create expired token
-    data = {"sub": "user@example.com"}
-    expires_delta = timedelta(minutes=-60)  # Negative delta = expired
-    token = create_access_token(data, expires_delta=expires_delta)
-    
     with pytest.raises(Exception):  # Should raise HTTPException
-        get_current_user(token=token, db=db)
+        get_current_user(token=expired_token, db=db)
 
 
 def test_get_current_user_no_sub(db):
@@ -17,7 +17,8 @@ def test_batch_job_defaults_and_relationships(db):
         granularity="sentence",
     )
     db.add(job)
-    db.commit()
+    db.flush()
+    db.refresh(job)
 
     refreshed_job = db.execute(select(BatchAnalysisJob)).scalars().first()
     assert refreshed_job is not None
@@ -44,7 +45,8 @@ def test_batch_document_defaults_and_links(db, test_user):
         word_count=5,
     )
     db.add(document)
-    db.commit()
+    db.flush()
+    db.refresh(document)
 
     refreshed_document = db.execute(select(BatchDocument)).scalars().first()
     assert refreshed_document is not None
@@ -53,3 +55,35 @@ def test_batch_document_defaults_and_links(db, test_user):
     assert refreshed_document.cluster_id is None
     assert refreshed_document.job == job
     assert job.documents[0] == refreshed_document
+
+
+@pytest.mark.usefixtures("db", "test_user")
+def test_batch_job_similarity_matrix_round_trip(db, test_user):
+    job = BatchAnalysisJob(
+        user_id=test_user.id,
+        granularity="sentence",
+        similarity_matrix=[[1.0, 0.5], [0.5, 1.0]],
+    )
+    db.add(job)
+    db.commit()
+    db.expire_all()
+
+    refreshed_job = db.execute(select(BatchAnalysisJob)).scalars().first()
+    assert refreshed_job.similarity_matrix == [[1.0, 0.5], [0.5, 1.0]]
+
+
+@pytest.mark.usefixtures("db", "test_user")
+def test_batch_job_similarity_matrix_accepts_array(db, test_user):
+    import numpy as np
+
+    job = BatchAnalysisJob(
+        user_id=test_user.id,
+        granularity="sentence",
+        similarity_matrix=np.array([[1.0, 0.5], [0.5, 1.0]], dtype=np.float32),
+    )
+    db.add(job)
+    db.commit()
+    db.expire_all()
+
+    refreshed_job = db.execute(select(BatchAnalysisJob)).scalars().first()
+    assert refreshed_job.similarity_matrix == [[1.0, 0.5], [0.5, 1.0]]
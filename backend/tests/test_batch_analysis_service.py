@@ -1,12 +1,16 @@
 """Tests for batch analysis service - similarity matrix and clustering."""
 
+from types import SimpleNamespace
+
 import numpy as np
 import pytest
 
+from app.services import batch_analysis_service
 from app.services.batch_analysis_service import (
     BatchAnalysisService,
     build_similarity_matrix,
     cluster_documents,
+    cluster_from_matrix,
     summarize_clusters,
 )
 
@@ -131,6 +135,25 @@ class TestBuildSimilarityMatrix:
         # Second and third: orthogonal (dot = 0)
         assert abs(result[1][2]) < 0.01
 
+    def test_float32_array_input_not_modified(self):
+        """A float32 array is used directly but never normalized in place."""
+        embeddings = np.array([[3.0, 4.0], [1.0, 0.0]], dtype=np.float32)
+        original = embeddings.copy()
+        result = build_similarity_matrix(embeddings)
+        assert abs(result[0][1] - 0.6) < 0.01
+        assert np.array_equal(embeddings, original)
+
+    def test_tiled_similarity_matches_gemm(self):
+        """Row-tiled product equals the full GEMM and stays exactly symmetric."""
+        from app.services.batch_analysis_service import _tiled_similarity
+
+        rng = np.random.default_rng(0)
+        embeddings = rng.normal(size=(50, 16)).astype(np.float32)
+        embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+        result = _tiled_similarity(embeddings, block=16)
+        assert np.allclose(result, embeddings @ embeddings.T, atol=1e-5)
+        assert np.array_equal(result, result.T)
+
     def test_different_dimensions(self):
         """Handle different embedding dimensions."""
         # 2D embeddings
@@ -146,6 +169,143 @@ class TestBuildSimilarityMatrix:
         assert abs(result[0][1]) < 0.01
 
 
+def _fake_cdist(a, b, metric):
+    """
+    Stand-in for simsimd.cdist(metric="cosine") in float64.
+
+    Like SimSIMD, two all-zero vectors get distance 0 (identical) and a
+    zero vector against a non-zero one gets distance 1.
+    """
+    assert metric == "cosine"
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    norms = np.outer(np.linalg.norm(a, axis=1), np.linalg.norm(b, axis=1))
+    similarity = np.divide(a @ b.T, norms, out=np.zeros_like(norms), where=norms > 0)
+    both_zero = np.outer(~a.any(axis=1), ~b.any(axis=1))
+    similarity[both_zero] = 1.0
+    return 1.0 - similarity
+
+
+@pytest.fixture
+def fake_simsimd(monkeypatch):
+    """Run the SimSIMD branch with a pure-numpy cdist, installed or not."""
+    monkeypatch.setattr(batch_analysis_service, "SIMSIMD_AVAILABLE", True)
+    monkeypatch.setattr(
+        batch_analysis_service, "simsimd", SimpleNamespace(cdist=_fake_cdist), raising=False
+    )
+
+
+class TestSimSIMDSimilarity:
+    """Tests for the SimSIMD kernel branch of the similarity matrix."""
+
+    def test_matches_gemm(self, fake_simsimd):
+        """Kernel result equals the GEMM result and is exactly symmetric."""
+        rng = np.random.default_rng(1)
+        embeddings = rng.normal(size=(20, 16)).astype(np.float32)
+        normalized = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+        result = np.array(build_similarity_matrix(embeddings))
+
+        expected = normalized @ normalized.T
+        np.fill_diagonal(expected, 1.0)
+        assert np.allclose(result, expected, atol=1e-5)
+        assert np.array_equal(result, result.T)
+
+    def test_zero_vectors_score_zero(self, fake_simsimd):
+        """Placeholder zero rows are not similar to each other or anything else."""
+        embeddings = [
+            [1.0, 0.0, 0.0],
+            [0.0, 0.0, 0.0],
+            [1.0, 0.0, 0.0],
+            [0.0, 0.0, 0.0],
+        ]
+
+        result = np.array(build_similarity_matrix(embeddings))
+
+        assert result[1, 3] == 0.0
+        assert np.all(result[[1, 3]][:, [0, 2]] == 0.0)
+        assert np.all(np.diag(result) == 1.0)
+        assert abs(result[0, 2] - 1.0) < 1e-6
+
+        clusters = cluster_documents(embeddings, threshold=0.85)
+        members = sorted(sorted(c["document_ids"]) for c in clusters)
+        assert members == [[0, 2], [1], [3]]
+
+    def _clustered_embeddings(self, n_rows):
+        """Tight groups around random centroids, far from the 0.85 threshold."""
+        rng = np.random.default_rng(2)
+        centroids = rng.normal(size=(8, 64))
+        labels = np.arange(n_rows) % len(centroids)
+        embeddings = centroids[labels] + rng.normal(scale=0.05, size=(n_rows, 64))
+        return embeddings.astype(np.float32)
+
+    def test_int8_path_within_quantization_error(self, fake_simsimd, monkeypatch):
+        """Large batches use int8 codes and stay within rounding error of float32."""
+        kernel_dtypes = []
+
+        def recording_cdist(a, b, metric):
+            kernel_dtypes.append(a.dtype)
+            return _fake_cdist(a, b, metric)
+
+        monkeypatch.setattr(batch_analysis_service.simsimd, "cdist", recording_cdist)
+        n_rows = batch_analysis_service.INT8_MIN_DOCUMENTS + 44
+        embeddings = self._clustered_embeddings(n_rows)
+        # Placeholder for a failed embedding and a very low-magnitude row
+        embeddings[5] = 0.0
+        embeddings[9] = embeddings[1] * 1e-6
+
+        result = np.array(build_similarity_matrix(embeddings))
+
+        assert kernel_dtypes == [np.int8]
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        normalized = embeddings / norms
+        expected = normalized @ normalized.T
+        np.fill_diagonal(expected, 1.0)
+        error = np.abs(result - expected)
+        assert error.mean() <= 0.5 / 127
+        assert error.max() <= 2.0 / 127
+        assert np.array_equal(result, result.T)
+        assert np.all(np.delete(result[5], 5) == 0.0)
+        assert result[1, 9] > 0.99
+
+    def test_int8_clusters_match_float32(self, fake_simsimd, monkeypatch):
+        """Quantization does not move documents between well-separated clusters."""
+        n_rows = batch_analysis_service.INT8_MIN_DOCUMENTS
+        embeddings = self._clustered_embeddings(n_rows)
+        embeddings[[3, 7]] = 0.0
+
+        quantized = cluster_documents(embeddings, threshold=0.85)
+        monkeypatch.setattr(batch_analysis_service, "SIMSIMD_AVAILABLE", False)
+        reference = cluster_documents(embeddings, threshold=0.85)
+
+        members = lambda clusters: sorted(sorted(c["document_ids"]) for c in clusters)
+        assert members(quantized) == members(reference)
+        assert [3] in members(quantized) and [7] in members(quantized)
+
+
+IDENTICAL_EMBEDDINGS = [
+    [1.0, 0.0, 0.0],
+    [1.0, 0.0, 0.0],
+    [1.0, 0.0, 0.0],
+]
+ORTHOGONAL_EMBEDDINGS = [
+    [1.0, 0.0, 0.0],
+    [0.0, 1.0, 0.0],
+    [0.0, 0.0, 1.0],
+]
+
+
+
+@pytest.fixture(scope="class")
+def similarity_matrices():
+    """Similarity matrices of the shared embedding sets, built once per class."""
+    return {
+        "identical": build_similarity_matrix(IDENTICAL_EMBEDDINGS),
+        "orthogonal": build_similarity_matrix(ORTHOGONAL_EMBEDDINGS),
+    }
+
+
 class TestClusterDocuments:
     """Tests for cluster_documents function."""
 
@@ -164,12 +324,7 @@ class TestClusterDocuments:
 
     def test_identical_documents_same_cluster(self):
         """Identical documents should be in the same cluster."""
-        embeddings = [
-            [1.0, 0.0, 0.0],
-            [1.0, 0.0, 0.0],
-            [1.0, 0.0, 0.0],
-        ]
-        result = cluster_documents(embeddings)
+        result = cluster_documents(IDENTICAL_EMBEDDINGS)
         assert len(result) == 1
         assert result[0]["cluster_id"] == 0
         assert set(result[0]["document_ids"]) == {0, 1, 2}
@@ -201,14 +356,9 @@ class TestClusterDocuments:
         result = cluster_documents(embeddings, threshold=0.6)
         assert len(result) == 2
 
-    def test_cluster_id_sequence(self):
+    def test_cluster_id_sequence(self, similarity_matrices):
         """Cluster IDs should be sequential starting from 0."""
-        embeddings = [
-            [1.0, 0.0, 0.0],
-            [0.0, 1.0, 0.0],
-            [0.0, 0.0, 1.0],
-        ]
-        result = cluster_documents(embeddings, threshold=0.5)
+        result = cluster_from_matrix(similarity_matrices["orthogonal"], threshold=0.5)
         cluster_ids = [c["cluster_id"] for c in result]
         assert sorted(cluster_ids) == list(range(len(result)))
 
@@ -246,14 +396,9 @@ class TestClusterDocuments:
         cluster_1 = next(c for c in result if c["cluster_id"] == 1)
         assert set(cluster_1["document_ids"]) == {2, 3}
 
-    def test_avg_similarity_calculation(self):
+    def test_avg_similarity_calculation(self, similarity_matrices):
         """Average similarity should be calculated correctly."""
-        embeddings = [
-            [1.0, 0.0, 0.0],
-            [1.0, 0.0, 0.0],
-            [1.0, 0.0, 0.0],
-        ]
-        result = cluster_documents(embeddings)
+        result = cluster_from_matrix(similarity_matrices["identical"])
         # For identical vectors, all pairs are 1.0
         # avg_similarity should be 1.0
         assert result[0]["avg_similarity"] == 1.0
@@ -266,14 +411,9 @@ class TestClusterDocuments:
         json_str = json.dumps(result)
         assert json_str is not None
 
-    def test_threshold_0_all_same_cluster(self):
+    def test_threshold_0_all_same_cluster(self, similarity_matrices):
         """With threshold 0, all documents in same cluster."""
-        embeddings = [
-            [1.0, 0.0, 0.0],
-            [0.0, 1.0, 0.0],
-            [0.0, 0.0, 1.0],
-        ]
-        result = cluster_documents(embeddings, threshold=0.0)
+        result = cluster_from_matrix(similarity_matrices["orthogonal"], threshold=0.0)
         assert len(result) == 1
         assert set(result[0]["document_ids"]) == {0, 1, 2}
 
@@ -286,6 +426,15 @@ class TestClusterDocuments:
         result = cluster_documents(embeddings, threshold=1.01)  # above max
         assert len(result) == 2
 
+    def test_matrix_entry_point_matches_embeddings(self, similarity_matrices):
+        """Clustering a precomputed matrix gives the same result as from embeddings."""
+        for name, embeddings in (
+            ("identical", IDENTICAL_EMBEDDINGS),
+            ("orthogonal", ORTHOGONAL_EMBEDDINGS),
+        ):
+            assert cluster_from_matrix(similarity_matrices[name], threshold=0.5) == \
+                cluster_documents(embeddings, threshold=0.5)
+
     def test_deterministic_output(self):
         """Same input should produce same output."""
         embeddings = [
@@ -364,6 +513,23 @@ class TestBatchAnalysisService:
         result = service.cluster_documents(embeddings, threshold=0.85)
         assert len(result) == 2
 
+    def test_analyze_batch_method(self):
+        """analyze_batch matches the matrix, clusters and summary built separately."""
+        service = BatchAnalysisService()
+        embeddings = [[1.0, 0.0], [0.95, 0.05], [0.0, 1.0]]
+        result = service.analyze_batch(embeddings, threshold=0.85)
+        assert isinstance(result["similarity_matrix"], np.ndarray)
+        assert result["similarity_matrix"].tolist() == service.build_similarity_matrix(embeddings)
+        assert result["clusters"] == service.cluster_documents(embeddings, threshold=0.85)
+        assert result["summary"] == result["clusters"]
+
+    def test_analyze_batch_empty(self):
+        """Empty input gives empty matrix, clusters and summary."""
+        result = BatchAnalysisService().analyze_batch([])
+        assert result["similarity_matrix"].size == 0
+        assert result["clusters"] == []
+        assert result["summary"] == []
+
     def test_summarize_clusters_method(self):
         """Service method should delegate to function."""
         service = BatchAnalysisService()
@@ -5,33 +5,23 @@ import pytest
 from io import BytesIO
 from unittest.mock import Mock, patch, MagicMock
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
 
 from app.main import app
-from app.models.database import Base, get_db, User, BatchAnalysisJob, BatchDocument
+from app.models.database import get_db, User, BatchAnalysisJob, BatchDocument
 from app.models.schemas import BatchJobStatus, BatchDocumentStatus
 from app.utils.auth import create_access_token
 
 
-# Test database setup
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test_batch.db"
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-
 @pytest.fixture
-def db_session():
-    """Create a test database session."""
-    Base.metadata.create_all(bind=engine)
-    db = TestingSessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-        Base.metadata.drop_all(bind=engine)
+def db_session(db):
+    """
+    Create a test database session.
+
+    This is conftest's shared session: the schema is created once per test
+    session and each test's writes are rolled back, instead of creating and
+    dropping every table around each test.
+    """
+    return db
 
 
 @pytest.fixture
@@ -0,0 +1,51 @@
+"""
+Tests for batch analysis Celery tasks.
+"""
+import pytest
+from unittest.mock import MagicMock, patch
+
+from app.models.database import BatchAnalysisJob
+from app.models.schemas import BatchJobStatus
+from app.tasks.batch_tasks import process_batch_job
+
+
+@pytest.fixture
+def task_db(db):
+    """Run the task against the test session instead of SessionLocal."""
+    with patch("app.tasks.batch_tasks.SessionLocal", return_value=db), \
+            patch("app.tasks.batch_tasks.get_analysis_service", return_value=MagicMock()), \
+            patch("app.tasks.batch_tasks.get_batch_analysis_service", return_value=MagicMock()):
+        yield db
+
+
+def _create_job(db, user, status):
+    job = BatchAnalysisJob(user_id=user.id, granularity="sentence", status=status)
+    db.add(job)
+    db.commit()
+    return job.id
+
+
+def test_process_batch_job_not_found(task_db):
+    """A job id with no row is reported as not found."""
+    result = process_batch_job(999999)
+    assert result == {"job_id": 999999, "status": "error", "error": "Job not found"}
+
+
+def test_process_batch_job_already_claimed(task_db, test_user):
+    """A job another worker already moved to PROCESSING is not processed again."""
+    job_id = _create_job(task_db, test_user, BatchJobStatus.PROCESSING)
+
+    result = process_batch_job(job_id)
+
+    assert result == {"job_id": job_id, "status": "already_claimed"}
+
+
+def test_process_batch_job_claims_pending_job_once(task_db, test_user):
+    """A PENDING job is claimed and completed; a second delivery is skipped."""
+    job_id = _create_job(task_db, test_user, BatchJobStatus.PENDING)
+
+    first = process_batch_job(job_id)
+    second = process_batch_job(job_id)
+
+    assert first["status"] == "completed"
+    assert second == {"job_id": job_id, "status": "already_claimed"}
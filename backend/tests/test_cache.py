@@ -83,7 +83,8 @@ class TestCacheUtilities:
         fingerprint_data = {"vector": [0.1, 0.2, 0.3]}
         cache_fingerprint(1, fingerprint_data)
         
-        mock_client.setex.assert_called_once()
+        mock_client.set.assert_called_once()
+        assert mock_client.set.call_args.kwargs["nx"] == False
     
     @patch("app.utils.cache.get_redis_client")
     def test_cache_analysis_result(self, mock_redis):
@@ -96,4 +97,31 @@ class TestCacheUtilities:
         result = {"segments": [], "overall_ai_probability": 0.5}
         cache_analysis_result("abc123", result, user_id=1)
         
-        mock_client.setex.assert_called_once()
+        mock_client.set.assert_called_once()
+        assert mock_client.set.call_args.kwargs["nx"] == True
+    
+    @patch("app.utils.cache.get_redis_client")
+    def test_mget_cached_no_redis(self, mock_redis):
+        """Test mget_cached returns aligned misses when Redis is unavailable."""
+        from app.utils.cache import mget_cached
+        
+        mock_redis.return_value = None
+        
+        assert mget_cached(["a", "b"]) == [None, None]
+    
+    @patch("app.utils.cache.get_redis_client")
+    def test_get_cached_analyses_uses_pipeline(self, mock_redis):
+        """Test batched analysis lookups share a single pipeline."""
+        from app.utils.cache import get_cached_analyses
+        
+        mock_client = MagicMock()
+        pipe = mock_client.pipeline.return_value.__enter__.return_value
+        pipe.execute.return_value = [b'{"overall_ai_probability": 0.5}', None]
+        mock_redis.return_value = mock_client
+        
+        result = get_cached_analyses(["abc", "def"])
+        
+        assert result == [{"overall_ai_probability": 0.5}, None]
+        mock_client.pipeline.assert_called_once_with(transaction=False)
+        assert pipe.get.call_count == 2
+        pipe.get.assert_any_call("analysis:abc")
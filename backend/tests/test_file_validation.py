@@ -0,0 +1,59 @@
+"""
+Tests for file validation utilities.
+"""
+import pytest
+from fastapi import HTTPException
+from app.utils.file_validation import (
+    detect_file_type,
+    validate_file_content,
+    validate_text_length,
+    utf8_len,
+    MAX_TEXT_SIZE,
+)
+
+
+def test_detect_file_type():
+    """Test magic-byte detection of signed formats."""
+    assert detect_file_type(b"%PDF-1.4\n") == ".pdf"
+    assert detect_file_type(b"PK\x03\x04\x14\x00") == ".docx"
+    assert detect_file_type(b"plain text") is None
+
+
+def test_validate_file_content_matching():
+    """Test content matching its extension is accepted."""
+    validate_file_content(None, ".pdf", b"%PDF-1.4\n")
+    validate_file_content(None, ".txt", b"plain text")
+
+
+def test_validate_file_content_missing_signature():
+    """Test a signed format without its signature is rejected."""
+    with pytest.raises(HTTPException) as exc_info:
+        validate_file_content(None, ".docx", b"fake docx")
+    
+    assert exc_info.value.status_code == 400
+
+
+def test_validate_file_content_spoofed_extension():
+    """Test a PDF renamed to .txt is rejected."""
+    with pytest.raises(HTTPException) as exc_info:
+        validate_file_content(None, ".txt", b"%PDF-1.4\n")
+    
+    assert exc_info.value.status_code == 400
+    assert "spoofing" in exc_info.value.detail
+
+
+def test_validate_text_length():
+    """Test the text length limit, including multi-byte characters."""
+    validate_text_length("a" * MAX_TEXT_SIZE)
+    
+    with pytest.raises(HTTPException) as exc_info:
+        validate_text_length("é" * MAX_TEXT_SIZE)
+    
+    assert exc_info.value.status_code == 413
+
+
+def test_utf8_len():
+    """Test UTF-8 byte length for ASCII and multi-byte text."""
+    assert utf8_len("hello") == 5
+    assert utf8_len("héllo") == 6
+    assert utf8_len("") == 0
@@ -44,8 +44,8 @@ def test_upload_docx_file(client, auth_headers):
         headers=auth_headers,
         files={"file": ("sample.docx", BytesIO(file_content), "application/vnd.openxmlformats-officedocument.wordprocessingml.document")}
     )
-    # May fail if docx is invalid, but should handle gracefully
-    assert response.status_code in [status.HTTP_201_CREATED, status.HTTP_500_INTERNAL_SERVER_ERROR]
+    # Content without the ZIP signature is rejected as a spoofed DOCX
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
 
 
 def test_upload_pdf_file(client, auth_headers):
@@ -0,0 +1,179 @@
+"""
+Tests for Ollama embedding helpers (HTTP calls are mocked).
+"""
+import logging
+
+import numpy as np
+import pytest
+import requests
+from unittest.mock import MagicMock, patch
+
+from app.ml import ollama_embeddings
+from app.ml.ollama_embeddings import (
+    CACHE_TTL_EMBEDDING_DIM,
+    DEFAULT_EMBEDDING_DIM,
+    get_embedding_dim,
+    get_ollama_embeddings,
+)
+
+
+def _vector_for(text):
+    """Distinct, text-dependent raw embedding so order can be checked."""
+    return [float(len(text)), float(ord(text[0])), 1.0]
+
+
+def _expected(text):
+    vec = np.array(_vector_for(text))
+    return vec / np.linalg.norm(vec)
+
+
+def _embed_response(json_body):
+    response = MagicMock()
+    response.json.return_value = json_body
+    response.raise_for_status.return_value = None
+    return response
+
+
+def _echo_embed(url, json, timeout):
+    """Mimic /api/embed: one vector per input, in input order."""
+    return _embed_response({"embeddings": [_vector_for(t) for t in json["input"]]})
+
+
+@pytest.fixture(autouse=True)
+def embedding_state(monkeypatch):
+    """Isolate the discovered dimension and Redis from each test."""
+    monkeypatch.setattr(ollama_embeddings, "_EMBEDDING_DIM", None)
+    monkeypatch.delenv("OLLAMA_EMBEDDING_DIM", raising=False)
+    monkeypatch.setenv("OLLAMA_BASE_URL", "http://ollama:11434")
+    monkeypatch.setenv("OLLAMA_EMBEDDING_MODEL", "nomic-embed-text")
+    with patch("app.ml.ollama_embeddings.get_cached", return_value=None) as get_cached, \
+            patch("app.ml.ollama_embeddings.set_cached") as set_cached:
+        yield get_cached, set_cached
+
+
+@pytest.fixture
+def mock_post():
+    with patch("app.ml.ollama_embeddings.requests.post") as post:
+        yield post
+
+
+class TestGetOllamaEmbeddings:
+    """Test batched embedding requests."""
+
+    def test_batches_requests(self, mock_post):
+        """Texts are sent in batches of at most batch_size to /api/embed."""
+        mock_post.side_effect = _echo_embed
+        texts = ["alpha", "bravo", "charlie", "delta", "echo"]
+
+        get_ollama_embeddings(texts, batch_size=2)
+
+        assert mock_post.call_count == 3
+        inputs = [call.kwargs["json"]["input"] for call in mock_post.call_args_list]
+        assert inputs == [["alpha", "bravo"], ["charlie", "delta"], ["echo"]]
+        for call in mock_post.call_args_list:
+            assert call.args[0] == "http://ollama:11434/api/embed"
+            assert call.kwargs["json"]["model"] == "nomic-embed-text"
+
+    def test_results_follow_input_order(self, mock_post):
+        """Each vector lines up with its text, with None for empty texts."""
+        mock_post.side_effect = _echo_embed
+        texts = ["alpha", "", "bravo", "   ", "charlie"]
+
+        results = get_ollama_embeddings(texts, batch_size=2)
+
+        assert len(results) == len(texts)
+        assert results[1] is None and results[3] is None
+        for i in (0, 2, 4):
+            np.testing.assert_allclose(results[i], _expected(texts[i]))
+            assert np.linalg.norm(results[i]) == pytest.approx(1.0)
+
+        # Empty texts are never sent
+        sent = [t for call in mock_post.call_args_list for t in call.kwargs["json"]["input"]]
+        assert sent == ["alpha", "bravo", "charlie"]
+
+    def test_no_request_for_only_empty_texts(self, mock_post):
+        """All-empty input makes no HTTP request."""
+        assert get_ollama_embeddings(["", "  "]) == [None, None]
+        mock_post.assert_not_called()
+
+    def test_failed_batch_falls_back_to_none(self, mock_post, caplog):
+        """A timed-out batch yields None for its texts only."""
+        mock_post.side_effect = [
+            _echo_embed(None, {"input": ["alpha", "bravo"]}, 30),
+            requests.exceptions.Timeout(),
+            _echo_embed(None, {"input": ["echo"]}, 30),
+        ]
+        texts = ["alpha", "bravo", "charlie", "delta", "echo"]
+
+        with caplog.at_level(logging.WARNING, logger="app.ml.ollama_embeddings"):
+            results = get_ollama_embeddings(texts, batch_size=2)
+
+        np.testing.assert_allclose(results[0], _expected("alpha"))
+        np.testing.assert_allclose(results[1], _expected("bravo"))
+        assert results[2] is None and results[3] is None
+        np.testing.assert_allclose(results[4], _expected("echo"))
+        assert "timed out" in caplog.text
+
+    def test_misaligned_response_is_discarded(self, mock_post, caplog):
+        """A response with the wrong number of vectors is not assigned."""
+        mock_post.side_effect = [
+            _embed_response({"embeddings": [_vector_for("alpha")]}),
+            _echo_embed(None, {"input": ["charlie"]}, 30),
+        ]
+
+        with caplog.at_level(logging.WARNING, logger="app.ml.ollama_embeddings"):
+            results = get_ollama_embeddings(["alpha", "bravo", "charlie"], batch_size=2)
+
+        assert results[0] is None and results[1] is None
+        np.testing.assert_allclose(results[2], _expected("charlie"))
+        assert "misaligned" in caplog.text
+
+    def test_connection_error_stops_remaining_batches(self, mock_post, caplog):
+        """When Ollama is unreachable, later batches are not attempted."""
+        mock_post.side_effect = requests.exceptions.ConnectionError()
+
+        with caplog.at_level(logging.WARNING, logger="app.ml.ollama_embeddings"):
+            results = get_ollama_embeddings(["alpha", "bravo", "charlie"], batch_size=1)
+
+        assert results == [None, None, None]
+        assert mock_post.call_count == 1
+        assert "Cannot connect to Ollama" in caplog.text
+
+
+class TestEmbeddingDim:
+    """Test embedding dimension discovery."""
+
+    def test_default_without_any_source(self):
+        """Falls back to the default when nothing is known."""
+        assert get_embedding_dim() == DEFAULT_EMBEDDING_DIM
+
+    def test_env_override(self, monkeypatch, embedding_state):
+        """OLLAMA_EMBEDDING_DIM is used without consulting Redis."""
+        get_cached, _ = embedding_state
+        monkeypatch.setenv("OLLAMA_EMBEDDING_DIM", "384")
+
+        assert get_embedding_dim() == 384
+        get_cached.assert_not_called()
+
+    def test_reads_dimension_cached_by_another_worker(self, embedding_state):
+        """A dimension persisted in Redis is picked up and remembered."""
+        get_cached, _ = embedding_state
+        get_cached.return_value = 1024
+
+        assert get_embedding_dim() == 1024
+        get_cached.assert_called_once_with("ollama:embedding_dim:nomic-embed-text")
+
+        get_cached.return_value = None
+        assert get_embedding_dim() == 1024
+
+    def test_discovered_from_embedding_response(self, mock_post, embedding_state):
+        """The vector length of a real response becomes the dimension and is cached once."""
+        _, set_cached = embedding_state
+        mock_post.side_effect = _echo_embed
+
+        get_ollama_embeddings(["alpha", "bravo", "charlie"], batch_size=1)
+
+        assert get_embedding_dim() == 3
+        set_cached.assert_called_once_with(
+            "ollama:embedding_dim:nomic-embed-text", 3, CACHE_TTL_EMBEDDING_DIM
+        )
@@ -0,0 +1,354 @@
+"""
+Tests for ensemble performance monitoring.
+"""
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services import performance_monitor as pm
+from app.services.performance_monitor import (
+    PerformanceMonitor,
+    _decode_timestamps,
+    _from_epoch_us,
+    _to_epoch_us,
+)
+
+
+# Probabilities chosen to hit every reliability bin, both bin edges and
+# values that are exactly representable so kernel/fallback results match
+SAMPLE_PROBS = [0.0, 0.05, 0.1, 0.25, 0.3, 0.5, 0.55, 0.7, 0.75, 0.9, 0.95, 1.0]
+SAMPLE_LABELS = [0, 0, 1, 0, 0, 1, 1, 0, 1, 1, 1, 1]
+
+
+@pytest.fixture
+def storage_path(tmp_path, monkeypatch):
+    """Point monitor persistence at a temporary file."""
+    path = tmp_path / "performance_monitor.json"
+    monkeypatch.setattr(PerformanceMonitor, "_get_storage_path", lambda self: str(path))
+    return path
+
+
+@pytest.fixture
+def monitor(storage_path):
+    """Fresh monitor with no persisted history."""
+    return PerformanceMonitor(min_predictions=5)
+
+
+def _track_samples(monitor, model_name="stylometric"):
+    for prob, label in zip(SAMPLE_PROBS, SAMPLE_LABELS):
+        monitor.track_prediction(model_name, prob, label)
+
+
+class TestTrackBatch:
+    """Test recording several model predictions at once."""
+
+    def test_records_known_models_and_skips_unknown(self, monitor):
+        """Unknown model names are skipped and not counted."""
+        recorded = monitor.track_batch(
+            {"stylometric": 0.8, "perplexity": 0.3, "unknown": 0.9},
+            actual_label=1,
+            document_id=7,
+            user_id=3,
+        )
+
+        assert recorded == 2
+        records = list(monitor._predictions)
+        assert [r.model_name for r in records] == ["stylometric", "perplexity"]
+        assert [r.was_correct for r in records] == [True, False]
+        assert all(r.document_id == 7 and r.user_id == 3 for r in records)
+
+    def test_shares_one_timestamp(self, monitor):
+        """All records of a batch carry the same timestamp."""
+        monitor.track_batch({"stylometric": 0.8, "perplexity": 0.3, "contrastive": 0.6}, 1)
+
+        assert len({r.timestamp for r in monitor._predictions}) == 1
+
+    def test_matches_individual_tracking(self, storage_path):
+        """A batch updates stats and EMA exactly like per-model calls."""
+        probs = {"stylometric": 0.8, "perplexity": 0.3, "contrastive": 0.6}
+        batched = PerformanceMonitor()
+        single = PerformanceMonitor()
+
+        for label in (1, 0, 1):
+            batched.track_batch(probs, label)
+            for name, prob in probs.items():
+                single.track_prediction(name, prob, label)
+
+        assert batched._ema_accuracy == single._ema_accuracy
+        for name in probs:
+            b = batched.get_model_stats(name)[name]
+            s = single.get_model_stats(name)[name]
+            assert b["correct_predictions"] == s["correct_predictions"]
+            assert b["total_predictions"] == s["total_predictions"]
+
+    def test_saves_once_threshold_is_crossed(self, monitor, monkeypatch):
+        """Persistence is triggered once a batch reaches SAVE_INTERVAL."""
+        saves = []
+        monkeypatch.setattr(monitor, "_save_to_storage", lambda: saves.append(1))
+        monitor._unsaved_count = pm.SAVE_INTERVAL - 1
+
+        monitor.track_batch({"stylometric": 0.8, "perplexity": 0.3}, 1)
+
+        assert saves == [1]
+
+    def test_track_ensemble_prediction_uses_batch(self, monitor, monkeypatch):
+        """The module-level helper records through the global monitor."""
+        monkeypatch.setattr(pm, "_performance_monitor", monitor)
+
+        pm.track_ensemble_prediction({"stylometric": 0.9, "ensemble": 0.7}, 1, document_id=1)
+
+        assert [r.model_name for r in monitor._predictions] == ["stylometric", "ensemble"]
+
+
+class TestKernelFallbacks:
+    """The numba kernels and the numpy/pure-Python paths must agree."""
+
+    @pytest.fixture
+    def sampled(self, monitor):
+        _track_samples(monitor)
+        return monitor
+
+    def _brier(self, monitor, monkeypatch, numba, numpy):
+        monkeypatch.setattr(pm, "NUMBA_AVAILABLE", numba)
+        monkeypatch.setattr(pm, "NUMPY_AVAILABLE", numpy)
+        return monitor.calculate_brier_score("stylometric")
+
+    def _reliability(self, monitor, monkeypatch, numba, n_bins=10):
+        monkeypatch.setattr(pm, "NUMBA_AVAILABLE", numba)
+        return monitor.get_reliability_data("stylometric", n_bins=n_bins)
+
+    def test_brier_pure_python(self, sampled, monkeypatch):
+        """Pure-Python Brier score matches the formula."""
+        expected = sum((p - l) ** 2 for p, l in zip(SAMPLE_PROBS, SAMPLE_LABELS)) / len(SAMPLE_PROBS)
+
+        assert self._brier(sampled, monkeypatch, False, False) == pytest.approx(expected)
+
+    @pytest.mark.skipif(not pm.NUMPY_AVAILABLE, reason="numpy not installed")
+    def test_brier_numpy_matches_pure_python(self, sampled, monkeypatch):
+        """Numpy Brier score matches the pure-Python fallback."""
+        pure = self._brier(sampled, monkeypatch, False, False)
+
+        assert self._brier(sampled, monkeypatch, False, True) == pytest.approx(pure)
+
+    @pytest.mark.skipif(not pm.NUMBA_AVAILABLE, reason="numba not installed")
+    def test_brier_kernel_matches_pure_python(self, sampled, monkeypatch):
+        """JIT Brier kernel matches the pure-Python fallback."""
+        pure = self._brier(sampled, monkeypatch, False, False)
+
+        assert self._brier(sampled, monkeypatch, True, True) == pytest.approx(pure)
+
+    @pytest.mark.skipif(not pm.NUMBA_AVAILABLE, reason="numba not installed")
+    @pytest.mark.parametrize("n_bins", [1, 4, 10])
+    def test_reliability_kernel_matches_pure_python(self, sampled, monkeypatch, n_bins):
+        """JIT binning matches the sorted pure-Python binning, edges included."""
+        pure = self._reliability(sampled, monkeypatch, False, n_bins)
+        jit = self._reliability(sampled, monkeypatch, True, n_bins)
+
+        assert jit["count"] == pure["count"]
+        assert jit["bin_edges"] == pure["bin_edges"]
+        assert jit["mean_predicted"] == pytest.approx(pure["mean_predicted"])
+        assert jit["mean_actual"] == pytest.approx(pure["mean_actual"])
+
+    def test_reliability_counts_upper_edge_in_last_bin(self, sampled, monkeypatch):
+        """A probability of exactly 1.0 lands in the last bin."""
+        data = self._reliability(sampled, monkeypatch, False)
+
+        assert sum(data["count"]) == len(SAMPLE_PROBS)
+        assert data["count"][-1] == 3  # 0.9, 0.95, 1.0
+
+    def test_no_data(self, monitor):
+        """Models without predictions get the worst score and no bins."""
+        assert monitor.calculate_brier_score("perplexity") == 1.0
+        assert monitor.get_reliability_data("perplexity") == {}
+
+
+class TestTimestampStorage:
+    """Test integer timestamp encoding and the storage round-trip."""
+
+    def test_epoch_us_round_trip(self):
+        """Datetimes survive conversion to epoch microseconds and back."""
+        ts = datetime(2026, 10, 16, 12, 30, 45, 123456)
+
+        assert _from_epoch_us(_to_epoch_us(ts)) == ts
+
+    def test_decode_integer_timestamps(self):
+        """Integer timestamps decode to the same datetimes as per-value parsing."""
+        stamps = [datetime(2026, 1, 1) + timedelta(seconds=i, microseconds=i) for i in range(5)]
+        values = [_to_epoch_us(ts) for ts in stamps]
+
+        decoded = _decode_timestamps(values)
+
+        assert decoded == stamps
+        assert all(type(ts) is datetime for ts in decoded)
+
+    def test_decode_legacy_iso_strings(self):
+        """ISO strings written by the old storage format still load."""
+        ts = datetime(2025, 5, 4, 3, 2, 1, 500)
+
+        assert _decode_timestamps([ts.isoformat(), _to_epoch_us(ts)]) == [ts, ts]
+
+    def test_decode_empty(self):
+        """An empty batch decodes to an empty list."""
+        assert _decode_timestamps([]) == []
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_save_load_round_trip(self, storage_path, monkeypatch, use_orjson):
+        """Records and EMA values survive a save/load cycle."""
+        if use_orjson and not pm.ORJSON_AVAILABLE:
+            pytest.skip("orjson not installed")
+        monkeypatch.setattr(pm, "ORJSON_AVAILABLE", use_orjson)
+
+        original = PerformanceMonitor()
+        original.track_batch({"stylometric": 0.8, "perplexity": 0.3}, 1, document_id=5, user_id=2)
+        original.track_prediction("ensemble", 0.4, 0)
+        original._save_to_storage()
+
+        loaded = PerformanceMonitor()
+
+        assert list(loaded._predictions) == list(original._predictions)
+        assert loaded._ema_accuracy == original._ema_accuracy
+
+    def test_timestamps_stored_as_integers(self, monitor, storage_path):
+        """Storage holds compact integer timestamps rather than ISO strings."""
+        monitor.track_prediction("stylometric", 0.8, 1)
+        monitor._save_to_storage()
+
+        data = json.loads(storage_path.read_bytes())
+
+        assert isinstance(data["predictions"][0]["timestamp"], int)
+
+    def test_loads_legacy_iso_storage(self, storage_path):
+        """A file written with ISO timestamps is still readable."""
+        ts = datetime(2026, 3, 1, 8, 0, 0)
+        storage_path.write_text(json.dumps({
+            "ema_accuracy": {"stylometric": 0.6},
+            "predictions": [{
+                "model_name": "stylometric",
+                "predicted_prob": 0.9,
+                "actual_label": 1,
+                "timestamp": ts.isoformat(),
+                "was_correct": True,
+            }],
+        }))
+
+        loaded = PerformanceMonitor()
+
+        assert [r.timestamp for r in loaded._predictions] == [ts]
+        assert loaded._ema_accuracy == {"stylometric": 0.6}
+
+    def test_save_keeps_only_most_recent(self, monitor, storage_path, monkeypatch):
+        """Only the newest MAX_PERSISTED_PREDICTIONS records are written."""
+        monkeypatch.setattr(pm, "MAX_PERSISTED_PREDICTIONS", 3)
+        for prob in (0.1, 0.2, 0.3, 0.4, 0.6):
+            monitor.track_prediction("stylometric", prob, 1)
+        monitor._save_to_storage()
+
+        data = json.loads(storage_path.read_bytes())
+
+        assert [p["predicted_prob"] for p in data["predictions"]] == [0.3, 0.4, 0.6]
+
+
+class TestWeightMemoization:
+    """Test that ensemble weights are cached between predictions."""
+
+    def test_weights_cached_until_next_prediction(self, monitor, monkeypatch):
+        """Stats are rebuilt only after a new prediction is tracked."""
+        calls = []
+        original = monitor.get_model_stats
+        monkeypatch.setattr(
+            monitor, "get_model_stats", lambda *a, **kw: calls.append(1) or original(*a, **kw)
+        )
+
+        first = monitor.update_weights()
+        second = monitor.update_weights()
+        assert len(calls) == 1
+        assert first == second
+
+        monitor.track_prediction("stylometric", 0.9, 1)
+        monitor.update_weights()
+        assert len(calls) == 2
+
+    def test_returned_weights_are_copies(self, monitor):
+        """Mutating the returned dict does not corrupt the cache."""
+        weights = monitor.update_weights()
+        weights["stylometric"] = 99.0
+
+        assert monitor.update_weights()["stylometric"] != 99.0
+
+    def test_weights_reflect_performance(self, monitor):
+        """A consistently correct model outweighs a consistently wrong one."""
+        for _ in range(10):
+            monitor.track_batch({"stylometric": 0.9, "perplexity": 0.1, "contrastive": 0.6}, 1)
+
+        weights = monitor.update_weights()
+
+        assert sum(weights.values()) == pytest.approx(1.0)
+        assert weights["stylometric"] > weights["perplexity"]
+        assert weights["perplexity"] > 0
+
+    def test_clearing_old_predictions_invalidates_cache(self, monitor):
+        """Dropping records forces a recomputation."""
+        monitor._predictions.append(pm.ModelPerformanceRecord(
+            model_name="stylometric",
+            predicted_prob=0.9,
+            actual_label=1,
+            timestamp=datetime.utcnow() - timedelta(days=60),
+            was_correct=True,
+        ))
+        monitor.update_weights()
+
+        assert monitor.clear_old_predictions(days_to_keep=30) == 1
+        assert monitor._weights_dirty
+
+
+class TestPredictionBuffer:
+    """Test the bounded in-memory prediction buffer."""
+
+    def test_oldest_records_evicted(self, storage_path, monkeypatch):
+        """The buffer holds at most MAX_IN_MEMORY_PREDICTIONS records."""
+        monkeypatch.setattr(pm, "MAX_IN_MEMORY_PREDICTIONS", 3)
+        monitor = PerformanceMonitor()
+
+        for prob in (0.1, 0.2, 0.3, 0.4):
+            monitor.track_prediction("stylometric", prob, 1)
+
+        assert [r.predicted_prob for r in monitor._predictions] == [0.2, 0.3, 0.4]
+
+    def test_clear_keeps_buffer_bounded(self, storage_path, monkeypatch):
+        """Rebuilding the buffer after pruning keeps the size limit."""
+        monkeypatch.setattr(pm, "MAX_IN_MEMORY_PREDICTIONS", 3)
+        monitor = PerformanceMonitor()
+        monitor.track_prediction("stylometric", 0.9, 1)
+
+        monitor.clear_old_predictions(days_to_keep=30)
+
+        assert monitor._predictions.maxlen == 3
+
+    def test_load_keeps_most_recent(self, storage_path, monkeypatch):
+        """Loading more records than fit keeps the newest ones."""
+        original = PerformanceMonitor()
+        for prob in (0.1, 0.2, 0.3, 0.4):
+            original.track_prediction("stylometric", prob, 1)
+        original._save_to_storage()
+
+        monkeypatch.setattr(pm, "MAX_IN_MEMORY_PREDICTIONS", 2)
+        loaded = PerformanceMonitor()
+
+        assert [r.predicted_prob for r in loaded._predictions] == [0.3, 0.4]
+
+    def test_history_returns_newest_first(self, monitor):
+        """History is limited and ordered by descending timestamp."""
+        base = datetime(2026, 1, 1)
+        for i in range(5):
+            monitor._predictions.append(pm.ModelPerformanceRecord(
+                model_name="stylometric",
+                predicted_prob=i / 10,
+                actual_label=0,
+                timestamp=base + timedelta(minutes=i),
+                was_correct=True,
+            ))
+
+        history = monitor.get_prediction_history("stylometric", limit=2)
+
+        assert [h["predicted_prob"] for h in history] == [0.4, 0.3]
@@ -51,8 +51,8 @@ def test_split_into_paragraphs_single_newline():
     text = "First line.\nSecond line.\nThird line."
     paragraphs = split_into_paragraphs(text)
     
-    # Should split by single newlines if no double newlines
-    assert len(paragraphs) >= 1
+    # Without blank lines, each line is its own paragraph
+    assert paragraphs == ["First line.", "Second line.", "Third line."]
 
 
 def test_split_into_paragraphs_empty():